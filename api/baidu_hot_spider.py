@@ -2,27 +2,203 @@
 百度热搜爬虫模块
 用于获取百度热搜榜的实时数据
 """
-import requests
+import asyncio
+import codecs
+import hashlib
+import importlib.util
 import re
 import json
-from typing import List, Dict, Any
+import os
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+import httpx
+
+
+# 百度热搜站点地址，可指向本地替身服务器（upstream_standin.py）以离线回放
+BAIDU_BASE_URL = os.getenv("BAIDU_BASE_URL", "https://top.baidu.com").rstrip("/")
+
+BOARD_URL = BAIDU_BASE_URL + "/board?tab={category}"
+
+HOT_SEARCH_CATEGORIES = ["realtime", "movie", "sport", "tech", "entertainment"]
+
+# 每个分类最多保留的条目数
+MAX_ITEMS = 50
+
+# 页面内嵌的榜单数据：<!--s-data:{"data":{"cards":[...]}}-->
+S_DATA_RE = re.compile(r'<!--s-data:(.*?)-->', re.S)
+
+S_DATA_START = b"<!--s-data:"
+S_DATA_END = b"-->"
+
+# Content-Type 中的 charset，以及 HTML 头部 <meta charset> / http-equiv 声明
+CHARSET_RE = re.compile(r'charset=["\']?([\w-]+)', re.I)
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+# 嗅探 <meta charset> 时只检查文档开头的字节数
+CHARSET_SNIFF_BYTES = 4096
+
+_json_decoder = json.JSONDecoder()
 
 
 class BaiduHotSearchSpider:
-    """百度热搜爬虫"""
+    """
+    百度热搜爬虫
+    内部使用一个长连接复用的 httpx.AsyncClient，运行在爬虫私有的事件循环线程上，
+    同步和异步调用方共享同一个连接池
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = 3,
+        http2: bool = False,
+        timeout: float = 10,
+        parse_bytes: bool = True
+    ):
+        """
+        Args:
+            max_concurrency: fetch_all 同时抓取的最大分类数
+            http2: 是否启用 HTTP/2（需要安装 h2）
+            timeout: 单次请求超时时间（秒）
+            parse_bytes: 是否直接在响应字节上定位榜单 JSON，避免解码整个页面
+        """
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.max_concurrency = max_concurrency
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.timeout = timeout
+        self.parse_bytes = parse_bytes
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._validators: Dict[str, Dict[str, Optional[str]]] = {}
+        self._stats = {"not_modified": 0, "unchanged": 0}
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """获取爬虫私有的事件循环，首次调用时在后台线程中启动"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="baidu-hot-spider", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取长连接客户端，只在爬虫私有的事件循环中调用"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                http2=self.http2,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    def _submit(self, coro):
+        """把协程提交到爬虫私有的事件循环，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+
+    async def _fetch_board(
+        self, category: str, known_hash: str = None
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """
+        抓取并解析分类榜单
+
+        known_hash 与上次抓取到的内容一致时带上 If-None-Match / If-Modified-Since；
+        服务端返回 304，或榜单内容哈希与 known_hash 相同时不再解析，返回 (None, 哈希)。
+        抓取失败返回 ([], None)
+        """
+        client = self._get_client()
+        headers = {}
+        validators = self._validators.get(category)
+        if known_hash and validators and validators["hash"] == known_hash:
+            if validators["etag"]:
+                headers["If-None-Match"] = validators["etag"]
+            if validators["last_modified"]:
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        try:
+            async with self._semaphore:
+                response = await client.get(BOARD_URL.format(category=category), headers=headers)
+            if response.status_code == 304:
+                self._stats["not_modified"] += 1
+                return None, known_hash
+            response.raise_for_status()
+
+            content = response.content
+            content_hash = hashlib.sha1(self._board_payload(content)).hexdigest()
+            if known_hash and content_hash == known_hash:
+                self._stats["unchanged"] += 1
+                self._remember(category, response, content_hash)
+                return None, content_hash
+
+            results = self._parse_content(content, response.headers.get("content-type"), category)
+            if results:
+                self._remember(category, response, content_hash)
+            return results, content_hash
+        except Exception as e:
+            print(f"获取百度热搜{category}失败: {e}")
+            return [], None
+
+    def _remember(self, category: str, response: httpx.Response, content_hash: str):
+        """记录分类的缓存校验信息，供下次条件请求使用"""
+        self._validators[category] = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "hash": content_hash
+        }
+
+    def _board_payload(self, content: bytes) -> bytes:
+        """用于计算内容哈希的榜单数据片段，找不到内嵌 JSON 时使用整个页面"""
+        start = content.find(S_DATA_START)
+        if start >= 0:
+            end = content.find(S_DATA_END, start)
+            if end >= 0:
+                return content[start:end]
+        return content
+
+    async def _fetch(self, category: str) -> List[Dict[str, Any]]:
+        results, _ = await self._fetch_board(category)
+        return results or []
+
+    async def _fetch_all(self, categories: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        results = await asyncio.gather(*(self._fetch(cat) for cat in categories))
+        return dict(zip(categories, results))
+
+    async def get_hot_search_async(self, category: str = "realtime") -> List[Dict[str, Any]]:
+        """
+        异步获取百度热搜数据，可在任意事件循环中 await
+
+        Args:
+            category: 分类，可选值：realtime(实时), movie(电影), sport(体育), tech(科技), entertainment(娱乐)
+
+        Returns:
+            热搜数据列表
+        """
+        return await asyncio.wrap_future(self._submit(self._fetch(category)))
+
+    async def fetch_all(self, categories: List[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        并发获取多个分类的热搜数据，同时进行的请求数不超过 max_concurrency
+
+        Args:
+            categories: 分类列表，默认为全部分类
+
+        Returns:
+            分类到热搜数据列表的映射
+        """
+        categories = list(categories or HOT_SEARCH_CATEGORIES)
+        return await asyncio.wrap_future(self._submit(self._fetch_all(categories)))
 
     def get_hot_search(self, category: str = "realtime") -> List[Dict[str, Any]]:
         """
-        获取百度热搜数据
+        获取百度热搜数据（同步接口）
 
         Args:
             category: 分类，可选值：realtime(实时), movie(电影), sport(体育), tech(科技), entertainment(娱乐)
@@ -30,55 +206,205 @@ class BaiduHotSearchSpider:
         Returns:
             热搜数据列表
         """
+        return self._submit(self._fetch(category)).result()
+
+    async def get_hot_search_if_changed_async(
+        self, category: str, known_hash: str = None
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """
+        条件获取百度热搜数据：内容与 known_hash 相同时不解析，返回 (None, 哈希)
+
+        Args:
+            category: 分类
+            known_hash: 调用方已有数据的内容哈希
+
+        Returns:
+            (热搜数据列表或 None, 内容哈希)
+        """
+        return await asyncio.wrap_future(self._submit(self._fetch_board(category, known_hash)))
+
+    def get_hot_search_if_changed(
+        self, category: str, known_hash: str = None
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """get_hot_search_if_changed_async 的同步版本"""
+        return self._submit(self._fetch_board(category, known_hash)).result()
+
+    def get_stats(self) -> Dict[str, int]:
+        """条件请求统计：304 次数及内容未变化次数"""
+        return dict(self._stats)
+
+    def close(self):
+        """关闭连接池并停止私有事件循环"""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _detect_charset(self, content: bytes, content_type: str = None) -> str:
+        """
+        确定响应编码
+        优先使用 Content-Type 中的 charset，其次嗅探文档开头的 <meta charset>，默认 utf-8
+        """
+        if content_type:
+            match = CHARSET_RE.search(content_type)
+            if match:
+                return self._normalize_charset(match.group(1))
+        match = META_CHARSET_RE.search(content[:CHARSET_SNIFF_BYTES])
+        if match:
+            return self._normalize_charset(match.group(1).decode("ascii", errors="ignore"))
+        return "utf-8"
+
+    def _normalize_charset(self, charset: str) -> str:
+        """规范化编码名称，gbk/gb2312 统一按超集 gb18030 解码，未知编码退回 utf-8"""
+        charset = charset.lower()
+        if charset in ("gbk", "gb2312"):
+            return "gb18030"
         try:
-            url = f"https://top.baidu.com/board?tab={category}"
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            codecs.lookup(charset)
+        except LookupError:
+            return "utf-8"
+        return charset
 
-            text = self._decode_response(response.content)
-            data = self._parse_response(text, category)
-            return data
-        except Exception as e:
-            print(f"获取百度热搜{category}失败: {e}")
-            return []
+    def _decode_response(self, content: bytes, content_type: str = None) -> str:
+        """按检测到的编码一次性解码响应内容"""
+        return content.decode(self._detect_charset(content, content_type), errors="replace")
 
-    def _decode_response(self, content: bytes) -> str:
-        """解码响应内容"""
-        encodings = ['utf-8', 'gbk', 'gb2312', 'gb18030']
-        for enc in encodings:
+    def _parse_content(self, content: bytes, content_type: str, category: str) -> List[Dict[str, Any]]:
+        """
+        解析响应字节
+        parse_bytes 开启时只解码内嵌的榜单 JSON 片段，找不到时再解码整个页面
+        """
+        if self.parse_bytes:
             try:
-                return content.decode(enc, errors='ignore')
-            except:
-                continue
-        return content.decode('utf-8', errors='ignore')
+                records = self._parse_board_bytes(content, self._detect_charset(content, content_type))
+                if records:
+                    return self._build_results(records)
+            except Exception as e:
+                print(f"解析榜单数据失败: {e}")
+        return self._parse_response(self._decode_response(content, content_type), category)
+
+    def _parse_board_bytes(self, content: bytes, charset: str) -> Optional[List[Dict[str, Any]]]:
+        """在响应字节中定位 <!--s-data:...--> 片段，只解码该片段"""
+        start = content.find(S_DATA_START)
+        if start < 0:
+            return None
+        start += len(S_DATA_START)
+        end = content.find(S_DATA_END, start)
+        if end < 0:
+            return None
+        data = json.loads(content[start:end].decode(charset, errors="replace"))
+        return self._records_from_cards(data.get("data", {}).get("cards"))
 
     def _parse_response(self, html: str, category: str) -> List[Dict[str, Any]]:
-        """解析HTML响应，提取热搜数据"""
+        """
+        解析HTML响应，提取热搜数据
+        优先解析页面内嵌的榜单 JSON，失败时退回正则匹配
+        """
         results = []
 
         try:
-            words = re.findall(r'"word":"([^"]+)"', html)
-            descs = re.findall(r'"desc":"([^"]*)"', html)
-            hot_scores = re.findall(r'"hotScore":"?(\d+)"?', html)
-            urls = re.findall(r'"url":"(https?://[^"]+)"', html)
-            imgs = re.findall(r'"img":"(https?://[^"]+)"', html)
-
-            min_len = min(len(words), 50)
-            for i in range(min_len):
-                results.append({
-                    "word": words[i] if i < len(words) else "",
-                    "desc": descs[i] if i < len(descs) else "",
-                    "hot_score": hot_scores[i] if i < len(hot_scores) else "",
-                    "url": urls[i] if i < len(urls) else "",
-                    "img": imgs[i] if i < len(imgs) else "",
-                    "index": i + 1,
-                    "is_top": i < 3
-                })
+            records = self._parse_board_json(html)
+            if records is None:
+                records = self._parse_with_regex(html)
+            results = self._build_results(records)
         except Exception as e:
             print(f"解析HTML失败: {e}")
 
         return results
 
+    def _build_results(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """把榜单条目转换为统一的热搜数据格式"""
+        results = []
+        for i, record in enumerate(records[:MAX_ITEMS]):
+            results.append({
+                "word": record.get("word") or "",
+                "desc": record.get("desc") or "",
+                "hot_score": str(record.get("hotScore") or ""),
+                "url": record.get("url") or "",
+                "img": record.get("img") or "",
+                "index": i + 1,
+                "is_top": i < 3
+            })
+        return results
+
+    def _parse_board_json(self, html: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        从页面内嵌的榜单数据中一次性解析出所有条目
+        数据位于 <!--s-data:{...}--> 注释中，找不到时再尝试直接定位 "cards" 数组
+
+        Returns:
+            按榜单顺序排列的条目列表，解析失败时返回 None
+        """
+        cards = None
+        match = S_DATA_RE.search(html)
+        if match:
+            try:
+                cards = json.loads(match.group(1)).get("data", {}).get("cards")
+            except ValueError:
+                cards = None
+
+        if cards is None:
+            pos = html.find('"cards":')
+            if pos < 0:
+                return None
+            try:
+                cards, _ = _json_decoder.raw_decode(html, html.index("[", pos))
+            except ValueError:
+                return None
+
+        return self._records_from_cards(cards)
+
+    def _records_from_cards(self, cards: Any) -> Optional[List[Dict[str, Any]]]:
+        """从 cards 数组中按顺序取出所有条目，没有条目时返回 None"""
+        if not isinstance(cards, list):
+            return None
+
+        records = []
+        for card in cards:
+            if isinstance(card, dict):
+                self._collect_records(card.get("topContent"), records)
+                self._collect_records(card.get("content"), records)
+        return records or None
+
+    def _collect_records(self, content: Any, records: List[Dict[str, Any]]):
+        """收集带 word 字段的条目，部分榜单的条目还会再嵌套一层 content"""
+        if not isinstance(content, list):
+            return
+        for entry in content:
+            if not isinstance(entry, dict):
+                continue
+            if entry.get("word"):
+                records.append(entry)
+            else:
+                self._collect_records(entry.get("content"), records)
+
+    def _parse_with_regex(self, html: str) -> List[Dict[str, Any]]:
+        """旧的正则解析方式，仅在找不到榜单 JSON 时使用，各字段按出现顺序对齐"""
+        words = re.findall(r'"word":"([^"]+)"', html)
+        descs = re.findall(r'"desc":"([^"]*)"', html)
+        hot_scores = re.findall(r'"hotScore":"?(\d+)"?', html)
+        urls = re.findall(r'"url":"(https?://[^"]+)"', html)
+        imgs = re.findall(r'"img":"(https?://[^"]+)"', html)
+
+        records = []
+        for i in range(min(len(words), MAX_ITEMS)):
+            records.append({
+                "word": words[i],
+                "desc": descs[i] if i < len(descs) else "",
+                "hotScore": hot_scores[i] if i < len(hot_scores) else "",
+                "url": urls[i] if i < len(urls) else "",
+                "img": imgs[i] if i < len(imgs) else "",
+            })
+        return records
+
+
+# 模块级共享爬虫，所有调用复用同一个连接池
+_spider = BaiduHotSearchSpider()
+
 
 def get_baidu_hot_search(category: str = "realtime") -> List[Dict[str, Any]]:
     """
@@ -90,13 +416,31 @@ def get_baidu_hot_search(category: str = "realtime") -> List[Dict[str, Any]]:
     Returns:
         热搜数据列表
     """
-    spider = BaiduHotSearchSpider()
-    return spider.get_hot_search(category)
+    return _spider.get_hot_search(category)
+
+
+async def get_baidu_hot_search_async(category: str = "realtime") -> List[Dict[str, Any]]:
+    """get_baidu_hot_search 的异步版本"""
+    return await _spider.get_hot_search_async(category)
+
+
+def get_baidu_hot_search_if_changed(
+    category: str, known_hash: str = None
+) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    """条件获取百度热搜数据，内容与 known_hash 相同时返回 (None, 哈希)"""
+    return _spider.get_hot_search_if_changed(category, known_hash)
+
+
+async def get_baidu_hot_search_if_changed_async(
+    category: str, known_hash: str = None
+) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    """get_baidu_hot_search_if_changed 的异步版本"""
+    return await _spider.get_hot_search_if_changed_async(category, known_hash)
 
 
 if __name__ == "__main__":
     spider = BaiduHotSearchSpider()
-    for cat in ['realtime', 'movie', 'sport', 'tech', 'entertainment']:
+    for cat in HOT_SEARCH_CATEGORIES:
         print(f"\n=== {cat.upper()} ===")
         data = spider.get_hot_search(cat)
         print(f"Got {len(data)} items")
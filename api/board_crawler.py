@@ -0,0 +1,223 @@
+"""
+百度热搜榜浏览器爬虫（Playwright 异步版）
+只启动一个浏览器，用有界的浏览器上下文池并发抓取各分类，每个页面有独立的截止时间，
+并记录每个分类的耗时；条目在页面内一次性提取，链接规范化和去重在 Python 中完成
+轻量模式（默认）拦截图片、字体、样式等非必要资源和第三方域名的请求，等待条目出现即提取，
+不等待网络空闲，并记录每个页面的传输字节数和提取耗时
+"""
+import asyncio
+import time
+from typing import Any, Dict, List
+from urllib.parse import urljoin, urlparse
+
+from baidu_hot_spider import BOARD_URL, HOT_SEARCH_CATEGORIES
+from item_id import make_item_id
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+
+# 榜单条目及其中各字段的选择器
+ITEM_SELECTOR = ".category-wrap_iQLoo"
+TITLE_SELECTOR = ".c-single-text-ellipsis"
+HOT_INDEX_SELECTOR = ".hot-index_1Bl1a"
+
+# 每个分类最多抓取的条数
+MAX_ITEMS = 30
+
+# 单个页面从打开到提取完成的截止时间（秒）
+PAGE_DEADLINE = 30
+
+# 同时打开的浏览器上下文数量
+MAX_CONTEXTS = 3
+
+# 轻量模式下拦截的资源类型
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet", "texttrack", "eventsource", "websocket", "manifest"}
+
+# 轻量模式下允许请求的第一方域名（后缀匹配），榜单地址所在的域名总是允许
+FIRST_PARTY_HOSTS = ("baidu.com", "bdstatic.com")
+
+# 相对链接和协议相对链接的基准地址
+BASE_URL = "https://top.baidu.com/"
+
+# 在页面内一次性提取所有条目的原始字段，避免逐个元素调用带来的大量浏览器往返
+EXTRACT_SCRIPT = """
+([itemSelector, titleSelector, hotIndexSelector]) =>
+    Array.from(document.querySelectorAll(itemSelector), (item) => {
+        const title = item.querySelector(titleSelector);
+        const link = item.querySelector('a');
+        const image = item.querySelector('img');
+        const hotIndex = item.querySelector(hotIndexSelector);
+        return {
+            title: title ? title.textContent : '',
+            url: link ? link.getAttribute('href') || '' : '',
+            image_url: image ? image.getAttribute('src') || '' : '',
+            hot_index: hotIndex ? hotIndex.textContent : ''
+        };
+    })
+"""
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+EXTRA_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache"
+}
+
+
+def normalize_board_items(raw_items: List[Dict[str, str]], category: str, max_items: int = MAX_ITEMS) -> List[Dict[str, Any]]:
+    """
+    规范化页面提取的原始条目：补全链接和图片地址，按标准化标题去重，重新编号排名
+
+    Args:
+        raw_items: EXTRACT_SCRIPT 返回的条目，字段为 title, url, image_url, hot_index
+    """
+    items = []
+    seen = set()
+    for raw in raw_items:
+        title = " ".join((raw.get("title") or "").split())
+        if not title:
+            continue
+        key = make_item_id(title)
+        if key in seen:
+            continue
+        seen.add(key)
+        url = (raw.get("url") or "").strip()
+        image_url = (raw.get("image_url") or "").strip()
+        items.append({
+            "rank": len(items) + 1,
+            "title": title,
+            "url": urljoin(BASE_URL, url) if url else "",
+            "image_url": urljoin(BASE_URL, image_url) if image_url else "",
+            "hot_index": (raw.get("hot_index") or "").strip(),
+            "category": category
+        })
+        if len(items) >= max_items:
+            break
+    return items
+
+
+class BrowserBoardCrawler:
+    """用一个浏览器并发抓取多个分类的热搜榜"""
+
+    def __init__(
+        self,
+        max_contexts: int = MAX_CONTEXTS,
+        page_deadline: float = PAGE_DEADLINE,
+        max_items: int = MAX_ITEMS,
+        lightweight: bool = True
+    ):
+        self.max_contexts = max_contexts
+        self.page_deadline = page_deadline
+        self.max_items = max_items
+        self.lightweight = lightweight
+        self.timings: Dict[str, float] = {}
+        self.page_stats: Dict[str, Dict[str, Any]] = {}
+        board_host = urlparse(BOARD_URL).hostname or ""
+        self.first_party_hosts = FIRST_PARTY_HOSTS + ((board_host,) if board_host else ())
+
+    def _is_first_party(self, url: str) -> bool:
+        host = (urlparse(url).hostname or "").lower()
+        return any(host == allowed or host.endswith("." + allowed) for allowed in self.first_party_hosts)
+
+    async def _route(self, route, stats: Dict[str, Any]):
+        """轻量模式的请求拦截：只放行第一方域名的文档、脚本和数据请求"""
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or not self._is_first_party(request.url):
+            stats["blocked"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _count_bytes(self, request, stats: Dict[str, Any]):
+        """累计已完成请求的响应大小（响应头 + 响应体）"""
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        stats["requests"] += 1
+        stats["bytes"] += sizes.get("responseHeadersSize", 0) + sizes.get("responseBodySize", 0)
+
+    async def _extract(self, page, category: str) -> List[Dict[str, Any]]:
+        """一次 page.evaluate 取回所有条目，再在 Python 中规范化"""
+        raw_items = await page.evaluate(EXTRACT_SCRIPT, [ITEM_SELECTOR, TITLE_SELECTOR, HOT_INDEX_SELECTOR])
+        return normalize_board_items(raw_items, category, self.max_items)
+
+    async def _load_and_extract(self, context, category: str) -> List[Dict[str, Any]]:
+        stats = {"requests": 0, "blocked": 0, "bytes": 0, "extract_seconds": None}
+        self.page_stats[category] = stats
+        if self.lightweight:
+            await context.route("**/*", lambda route: self._route(route, stats))
+        page = await context.new_page()
+        page.on("requestfinished", lambda request: self._count_bytes(request, stats))
+
+        start = time.perf_counter()
+        # 轻量模式只等 DOM 解析完成，随后等待条目出现，不等待网络空闲
+        await page.goto(BOARD_URL.format(category=category), wait_until="domcontentloaded" if self.lightweight else "networkidle")
+        try:
+            await page.wait_for_selector(ITEM_SELECTOR, timeout=15000)
+        except Exception:
+            print(f"{category} 关键元素加载超时，尝试提取现有数据")
+        items = await self._extract(page, category)
+        stats["extract_seconds"] = round(time.perf_counter() - start, 2)
+        return items
+
+    async def _crawl_category(self, browser, semaphore: asyncio.Semaphore, category: str) -> List[Dict[str, Any]]:
+        """在独立的浏览器上下文中抓取一个分类，超过截止时间或出错时返回空列表"""
+        async with semaphore:
+            start = time.perf_counter()
+            context = await browser.new_context(user_agent=USER_AGENT, extra_http_headers=EXTRA_HEADERS)
+            try:
+                return await asyncio.wait_for(self._load_and_extract(context, category), self.page_deadline)
+            except asyncio.TimeoutError:
+                print(f"抓取 {category} 分类超过 {self.page_deadline} 秒，放弃本次抓取")
+                return []
+            except Exception as e:
+                print(f"抓取 {category} 分类时出错: {e}")
+                return []
+            finally:
+                await context.close()
+                self.timings[category] = round(time.perf_counter() - start, 2)
+
+    async def crawl(self, categories: List[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        并发抓取各分类
+
+        Returns:
+            分类 -> 热搜条目列表（字段为 rank, title, url, image_url, hot_index, category），失败的分类为空列表
+        """
+        if async_playwright is None:
+            raise RuntimeError("浏览器抓取需要安装 playwright：pip install playwright && playwright install chromium")
+        categories = list(categories or HOT_SEARCH_CATEGORIES)
+        semaphore = asyncio.Semaphore(self.max_contexts)
+        start = time.perf_counter()
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True, args=["--disable-blink-features=AutomationControlled"])
+            try:
+                results = await asyncio.gather(
+                    *(self._crawl_category(browser, semaphore, category) for category in categories)
+                )
+            finally:
+                await browser.close()
+
+        boards = dict(zip(categories, results))
+        for category in categories:
+            stats = self.page_stats.get(category, {})
+            print(
+                f"  {category}: {len(boards[category])} 条，耗时 {self.timings.get(category, 0)} 秒，"
+                f"提取耗时 {stats.get('extract_seconds')} 秒，传输 {stats.get('bytes', 0) / 1024:.1f} KB"
+                f"（{stats.get('requests', 0)} 个请求，拦截 {stats.get('blocked', 0)} 个）"
+            )
+        print(f"浏览器抓取完成，总耗时 {time.perf_counter() - start:.2f} 秒")
+        return boards
+
+
+def crawl_boards(
+    categories: List[str] = None, max_contexts: int = MAX_CONTEXTS, lightweight: bool = True
+) -> Dict[str, List[Dict[str, Any]]]:
+    """同步入口：用浏览器并发抓取各分类的热搜榜，lightweight 为 False 时加载完整页面"""
+    return asyncio.run(BrowserBoardCrawler(max_contexts=max_contexts, lightweight=lightweight).crawl(categories))
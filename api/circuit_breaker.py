@@ -0,0 +1,100 @@
+"""
+熔断器模块
+按最近一段调用的失败率决定是否继续请求上游：
+    closed:    正常请求，记录结果
+    open:      失败率过高，直接拒绝请求，冷却时间过后进入 half_open
+    half_open: 只放行一次试探请求，成功则恢复 closed，失败则重新 open
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """基于滑动窗口失败率的熔断器，线程安全"""
+
+    def __init__(
+        self,
+        window: int = 10,
+        failure_rate: float = 0.5,
+        min_calls: int = 3,
+        open_seconds: float = 60
+    ):
+        """
+        Args:
+            window: 统计失败率的最近调用次数
+            failure_rate: 触发熔断的失败率
+            min_calls: 窗口内至少有这么多次调用才计算失败率
+            open_seconds: 熔断后的冷却时间（秒）
+        """
+        self.window = window
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._results: deque = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {"opened": 0, "rejected": 0}
+
+    def is_open(self) -> bool:
+        """熔断中且冷却时间未到，不改变状态"""
+        with self._lock:
+            return self.state == OPEN and time.time() - self._opened_at < self.open_seconds
+
+    def allow(self) -> bool:
+        """
+        是否允许本次请求上游
+        冷却时间过后放行一次试探请求，调用方必须随后调用 record_success 或 record_failure
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.time() - self._opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self._results.clear()
+            self._trial_in_flight = False
+            self._results.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN:
+                self._open()
+                return
+            self._results.append(False)
+            failures = self._results.count(False)
+            if len(self._results) >= self.min_calls and failures / len(self._results) >= self.failure_rate:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.time()
+        self._results.clear()
+        self._stats["opened"] += 1
+
+    def get_state(self) -> Dict[str, Any]:
+        """熔断器状态及统计"""
+        with self._lock:
+            state = dict(self._stats)
+            state["state"] = self.state
+            if self.state == OPEN:
+                state["retry_in"] = round(max(0.0, self.open_seconds - (time.time() - self._opened_at)), 1)
+            return state
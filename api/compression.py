@@ -0,0 +1,170 @@
+"""
+响应压缩模块
+快照类接口在渲染时就生成 gzip / brotli 压缩版本，请求时只按 Accept-Encoding 选择，不再消耗压缩 CPU；
+其他动态响应由 CompressionMiddleware 在超过大小阈值时即时压缩
+brotli 为可选依赖，未安装时只提供 gzip
+"""
+import gzip
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# 小于该大小（字节）的响应不压缩
+MINIMUM_SIZE = 1024
+
+# 按优先级排列的可用编码
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# 需要压缩的内容类型，SSE 等流式响应不压缩
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+
+
+def compress(body: bytes, encoding: str, precompress: bool = False) -> bytes:
+    """
+    压缩响应内容
+    预压缩（只在快照渲染时执行一次）使用最高压缩级别，即时压缩使用较快的级别
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if precompress else 5)
+    return gzip.compress(body, compresslevel=9 if precompress else 6, mtime=0)
+
+
+def precompress(body: bytes) -> Dict[str, bytes]:
+    """生成所有可用编码的压缩版本，内容太小时返回空字典"""
+    if len(body) < MINIMUM_SIZE:
+        return {}
+    return {encoding: compress(body, encoding, precompress=True) for encoding in SUPPORTED_ENCODINGS}
+
+
+def choose_encoding(accept_encoding: Optional[str], available=SUPPORTED_ENCODINGS) -> Optional[str]:
+    """根据 Accept-Encoding 请求头选择编码，q=0 表示不接受"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in available:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断 If-None-Match 请求头是否命中 ETag"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag == etag or tag == "W/" + etag:
+            return True
+    return False
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """不同编码是不同的表示，强 ETag 需要区分"""
+    if etag.startswith('"') and etag.endswith('"'):
+        return etag[:-1] + "-" + encoding + '"'
+    return etag
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    return content_type.split(";")[0].strip().lower() in COMPRESSIBLE_TYPES
+
+
+class CompressionMiddleware:
+    """
+    即时压缩中间件（ASGI）
+    只压缩一次性返回、内容类型可压缩且超过大小阈值的响应；
+    已经带有 Content-Encoding 的响应（预压缩的快照）和流式响应原样返回
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if passthrough or start_message is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type"))
+                or len(body) < self.minimum_size
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["etag"], encoding)
+            await send(start_message)
+            start_message = None
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def negotiated_response(request, rendered, headers: Dict[str, str]) -> Response:
+    """
+    返回预渲染的响应：按 Accept-Encoding 选择预压缩版本，If-None-Match 命中时返回 304
+    没有预压缩版本的（如按请求拼接的响应）在这里即时压缩
+
+    Args:
+        rendered: 带有 body、etag 和 encodings（预压缩版本）的预渲染响应
+        headers: 额外的响应头，ETag 由本函数设置
+    """
+    available = SUPPORTED_ENCODINGS if len(rendered.body) >= MINIMUM_SIZE else ()
+    encoding = choose_encoding(request.headers.get("accept-encoding"), available)
+    etag = encoded_etag(rendered.etag, encoding) if encoding else rendered.etag
+    headers = dict(headers, ETag=etag, Vary="Accept-Encoding")
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        body = rendered.encodings.get(encoding)
+        if body is None:
+            body = compress(rendered.body, encoding)
+        headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+    return Response(content=rendered.body, media_type="application/json", headers=headers)
@@ -1,8 +1,7 @@
-import psycopg2
-from datetime import datetime
+from hot_search_history import save_hot_search_board
 import time
 import random
-from playwright.sync_api import sync_playwright
+from crawl_pipeline import crawl_with_fallback
 
 def crawl_baidu_hot_search():
     """
@@ -18,6 +17,8 @@ def crawl_baidu_hot_search():
     ]
     
     try:
+        from playwright.sync_api import sync_playwright
+
         # 使用Playwright爬取百度热搜榜单
         print("使用Playwright爬取百度热搜榜单...")
         with sync_playwright() as p:
@@ -153,43 +154,17 @@ def crawl_baidu_hot_search():
 
 def insert_hot_search_data(data):
     """
-    将热搜数据插入到数据库
+    将热搜数据按分类追加为新的快照版本，并更新当前榜单指针
     """
-    conn = None
-    try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="demo",
-            user="postgres",
-            password="admin"
-        )
-        cur = conn.cursor()
-        
-        # 清空现有数据
-        cur.execute("DELETE FROM baidu_hot_search")
-        
-        # 插入新数据
-        for item in data:
-            cur.execute(
-                "INSERT INTO baidu_hot_search (title, url, image_url, hot_index, rank_num, category, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                (item["title"], item["url"], item.get("image_url", ""), item.get("hot_index", ""), item["rank"], item.get("category", "realtime"), datetime.now())
-            )
-        
-        conn.commit()
-        cur.close()
-        print(f"成功插入 {len(data)} 条热搜数据")
-        
-    except Exception as e:
-        print(f"插入数据失败: {e}")
-        if conn:
-            conn.rollback()
-    finally:
-        if conn:
-            conn.close()
+    saved = save_hot_search_board(data)
+    print(f"成功插入 {saved} 条热搜数据")
 
 def main():
     """
     主函数
+
+    Returns:
+        分类 -> 提供数据的级别（http / browser / partial / failed），抓取出错时为空字典
     """
     print("开始爬取百度热搜数据...")
     
@@ -198,8 +173,11 @@ def main():
     categories = [
         {"name": "realtime", "url": "https://top.baidu.com/board?tab=realtime", "display_name": "热搜"},
         {"name": "movie", "url": "https://top.baidu.com/board?tab=movie", "display_name": "电影"},
-        {"name": "sport", "url": "https://top.baidu.com/board?tab=sport", "display_name": "体育"}
+        {"name": "sport", "url": "https://top.baidu.com/board?tab=sport", "display_name": "体育"},
+        {"name": "tech", "url": "https://top.baidu.com/board?tab=tech", "display_name": "科技"},
+        {"name": "entertainment", "url": "https://top.baidu.com/board?tab=entertainment", "display_name": "娱乐"}
     ]
+    display_names = {category['name']: category['display_name'] for category in categories}
     
     # 优化策略：先尝试使用备选数据，然后再尝试爬取最新数据
     # 这样即使网络访问失败，也能确保有数据存入数据库
@@ -232,11 +210,27 @@ def main():
             "自行车比赛", "赛马比赛", "帆船比赛", "滑雪赛事", "冰球比赛",
             "武术比赛", "摔跤比赛", "柔道比赛", "跆拳道比赛", "击剑比赛",
             "射击比赛", "射箭比赛", "举重比赛", "体操比赛", "田径世锦赛"
+        ],
+        "tech": [
+            "人工智能大模型", "芯片制造新进展", "5G网络建设", "量子计算突破", "新能源电池技术",
+            "智能手机新品发布", "自动驾驶测试", "云计算服务", "机器人技术应用", "卫星互联网",
+            "操作系统更新", "网络安全事件", "虚拟现实设备", "可穿戴设备", "智能家居产品",
+            "半导体产业动态", "开源软件生态", "数据中心建设", "科技公司财报", "编程语言排行",
+            "低空经济发展", "脑机接口研究", "光刻机技术", "新型显示技术", "物联网应用",
+            "商业航天发射", "生物计算研究", "区块链应用", "数字人民币试点", "科技创新大赛"
+        ],
+        "entertainment": [
+            "热门综艺节目", "新剧开播", "演唱会门票开售", "明星新歌发布", "电视剧收视排行",
+            "音乐节阵容公布", "网络剧热播", "综艺嘉宾官宣", "偶像团体回归", "年度音乐盛典",
+            "影视剧定档", "明星公益活动", "话剧演出季", "动漫新番推荐", "短剧爆火",
+            "颁奖典礼红毯", "歌手巡演开启", "真人秀节目", "电视剧大结局", "经典剧集翻拍",
+            "脱口秀节目", "选秀节目总决赛", "纪录片开播", "舞台剧首演", "网络综艺排行",
+            "明星新作官宣", "音乐排行榜", "喜剧节目", "戏曲进校园", "跨年晚会节目单"
         ]
     }
     
     for category_name, topics in backup_topics.items():
-        display_name = "热搜" if category_name == "realtime" else "电影" if category_name == "movie" else "体育"
+        display_name = display_names[category_name]
         category_items = []
         for i, topic in enumerate(topics[:30], 1):
             category_items.append({
@@ -253,137 +247,18 @@ def main():
     # 2. 尝试爬取最新数据
     print("\n2. 尝试爬取最新数据...")
     latest_data = []
+    tiers = {}
     
     try:
-        with sync_playwright() as p:
-            print("启动浏览器...")
-            # 优化浏览器设置
-            browser = p.chromium.launch(
-                headless=True, 
-                timeout=60000,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                ]
-            )
-            print("浏览器启动成功")
-            
-            for category in categories:
-                print(f"\n爬取 {category['display_name']} 分类最新数据...")
-                try:
-                    page = browser.new_page()
-                    
-                    # 设置页面参数
-                    page.set_extra_http_headers({
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-                        'Accept-Language': 'zh-CN,zh;q=0.9',
-                        'Cache-Control': 'no-cache',
-                        'Connection': 'keep-alive',
-                        'Pragma': 'no-cache'
-                    })
-                    
-                    # 访问分类页面
-                    print(f"访问页面: {category['url']}")
-                    page.goto(category['url'], timeout=60000, wait_until='networkidle')
-                    print("页面访问成功")
-                    
-                    # 等待页面加载完成
-                    print("等待页面加载完成...")
-                    # 等待关键元素出现
-                    try:
-                        page.wait_for_selector('.category-wrap_iQLoo', timeout=15000)
-                        print("关键元素加载完成")
-                    except:
-                        print("关键元素加载超时，尝试提取现有数据")
-                    
-                    # 提取热搜数据
-                    print("提取热搜数据...")
-                    hot_search_items = page.query_selector_all('.category-wrap_iQLoo')
-                    print(f"找到 {len(hot_search_items)} 个热搜项")
-                    
-                    # 确保每个分类至少抓取30条数据
-                    category_items = []
-                    seen_titles = set()
-                    
-                    # 第一次抓取
-                    for i, item in enumerate(hot_search_items, 1):
-                        try:
-                            # 获取标题
-                            title_element = item.query_selector('.c-single-text-ellipsis')
-                            if not title_element:
-                                continue
-                            
-                            title = title_element.text_content().strip()
-                            
-                            # 去重
-                            if title in seen_titles:
-                                continue
-                            seen_titles.add(title)
-                            
-                            # 获取链接
-                            url_element = item.query_selector('a')
-                            url = ""
-                            if url_element:
-                                url = url_element.get_attribute('href')
-                                # 确保链接是完整的
-                                if not url.startswith('http'):
-                                    url = "https://top.baidu.com" + url
-                            
-                            # 获取图片
-                            image_element = item.query_selector('img')
-                            image_url = ""
-                            if image_element:
-                                image_url = image_element.get_attribute('src')
-                                # 确保图片链接是完整的
-                                if image_url and not image_url.startswith('http'):
-                                    image_url = "https:" + image_url
-                            
-                            # 获取热搜指数
-                            hot_index_element = item.query_selector('.hot-index_1Bl1a')
-                            hot_index = ""
-                            if hot_index_element:
-                                hot_index = hot_index_element.text_content().strip()
-                            
-                            # 添加到列表
-                            category_items.append({
-                                "rank": len(category_items) + 1,
-                                "title": title,
-                                "url": url,
-                                "image_url": image_url,
-                                "hot_index": hot_index,
-                                "category": category['name']
-                            })
-                            
-                            # 打印抓取的标题
-                            print(f"  {i}. {title} - {hot_index}")
-                            
-                            # 达到30条后停止
-                            if len(category_items) >= 30:
-                                break
-                        except Exception as e:
-                            print(f"处理第 {i} 个热搜项时出错: {e}")
-                            continue
-                    
-                    # 如果成功抓取到数据，使用最新数据
-                    if category_items:
-                        latest_data.extend(category_items)
-                        print(f"成功抓取 {category['display_name']} 分类的 {len(category_items)} 条最新数据")
-                    else:
-                        print(f"未抓取到 {category['display_name']} 分类的最新数据，将使用备选数据")
-                    
-                except Exception as e:
-                    print(f"爬取 {category['display_name']} 分类时出错: {e}")
-                    print(f"将使用备选数据作为 {category['display_name']} 分类的数据")
-                finally:
-                    if 'page' in locals():
-                        try:
-                            page.close()
-                        except:
-                            pass
-            
-            browser.close()
-            print("浏览器关闭成功")
-        
+        # 先用 HTTP 抓取，只有未通过校验的分类才启动浏览器
+        boards, tiers = crawl_with_fallback([category['name'] for category in categories])
+        for category in categories:
+            category_items = boards.get(category['name'], [])
+            if category_items:
+                latest_data.extend(category_items)
+                print(f"成功抓取 {category['display_name']} 分类的 {len(category_items)} 条最新数据（来源: {tiers[category['name']]}）")
+            else:
+                print(f"未抓取到 {category['display_name']} 分类的最新数据，将使用备选数据")
     except Exception as e:
         print(f"爬取过程中发生错误: {e}")
         import traceback
@@ -444,6 +319,8 @@ def main():
         insert_hot_search_data(final_data)
     else:
         print("未获取到热搜数据")
+    
+    return tiers
 
 if __name__ == "__main__":
     main()
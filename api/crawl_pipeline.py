@@ -0,0 +1,131 @@
+"""
+分级抓取流水线
+每个分类先用 HTTP 爬虫（BaiduHotSearchSpider，解析页面内嵌的榜单 JSON）抓取，
+结果未通过校验（条目太少、缺少标题）时才对这些分类启动浏览器抓取，并记录每个分类由哪一级提供
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from baidu_hot_spider import BaiduHotSearchSpider, HOT_SEARCH_CATEGORIES
+from board_crawler import MAX_ITEMS, crawl_boards, normalize_board_items
+
+
+# 通过校验所需的最少条目数
+MIN_ITEMS = 10
+
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+TIER_PARTIAL = "partial"
+TIER_FAILED = "failed"
+
+
+def count_missing_titles(items: List[Dict[str, Any]]) -> int:
+    """统计 HTTP 爬虫原始条目中标题（word）为空的条数，规范化时这些条目会被丢弃"""
+    return sum(1 for item in items if not " ".join(str(item.get("word") or "").split()))
+
+
+def validate_board(items: List[Dict[str, Any]], min_items: int = MIN_ITEMS, missing_titles: int = 0) -> Optional[str]:
+    """
+    校验一个分类的抓取结果
+
+    Args:
+        items: 规范化后的条目
+        min_items: 通过校验所需的最少条目数
+        missing_titles: 规范化前已丢弃的缺少标题的条数，页面结构变化时标题通常成批为空
+
+    Returns:
+        未通过的原因，通过时返回 None
+    """
+    missing = missing_titles + sum(1 for item in items if not item.get("title"))
+    if missing:
+        return f"{missing} 条缺少标题"
+    if len(items) < min_items:
+        return f"条目不足（{len(items)} < {min_items}）"
+    return None
+
+
+def http_items_to_board(items: List[Dict[str, Any]], category: str, max_items: int = MAX_ITEMS) -> List[Dict[str, Any]]:
+    """把 HTTP 爬虫的条目转换为浏览器爬虫的格式（rank, title, url, image_url, hot_index, category）"""
+    raw_items = [
+        {
+            "title": item.get("word", ""),
+            "url": item.get("url", ""),
+            "image_url": item.get("img", ""),
+            "hot_index": item.get("hot_score", "")
+        }
+        for item in items
+    ]
+    return normalize_board_items(raw_items, category, max_items)
+
+
+def _fetch_http(categories: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    spider = BaiduHotSearchSpider()
+    try:
+        return asyncio.run(spider.fetch_all(categories))
+    finally:
+        spider.close()
+
+
+def crawl_with_fallback(
+    categories: List[str] = None, min_items: int = MIN_ITEMS, use_browser: bool = True
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, str]]:
+    """
+    分级抓取各分类的热搜榜
+
+    Args:
+        categories: 分类列表，默认为全部分类
+        min_items: 通过校验所需的最少条目数
+        use_browser: HTTP 结果未通过校验时是否启动浏览器
+
+    Returns:
+        (分类 -> 热搜条目列表, 分类 -> 提供数据的级别 http / browser / partial / failed)；
+        两级都未通过校验时保留条目较多的一级的结果（partial），都没有数据时为空列表（failed）
+    """
+    categories = list(categories or HOT_SEARCH_CATEGORIES)
+    boards: Dict[str, List[Dict[str, Any]]] = {}
+    tiers: Dict[str, str] = {}
+
+    start = time.perf_counter()
+    try:
+        http_results = _fetch_http(categories)
+    except Exception as e:
+        print(f"HTTP 抓取出错: {e}")
+        http_results = {}
+
+    escalate = []
+    for category in categories:
+        raw_items = http_results.get(category) or []
+        items = http_items_to_board(raw_items, category)
+        boards[category] = items
+        reason = validate_board(items, min_items, count_missing_titles(raw_items))
+        if reason is None:
+            tiers[category] = TIER_HTTP
+        else:
+            print(f"{category} HTTP 抓取结果未通过校验：{reason}")
+            escalate.append(category)
+    print(f"HTTP 抓取完成，耗时 {time.perf_counter() - start:.2f} 秒，{len(categories) - len(escalate)}/{len(categories)} 个分类通过校验")
+
+    browser_results = {}
+    if escalate and use_browser:
+        print(f"启动浏览器抓取: {', '.join(escalate)}")
+        try:
+            browser_results = crawl_boards(escalate)
+        except Exception as e:
+            print(f"浏览器抓取出错: {e}")
+
+    for category in escalate:
+        items = browser_results.get(category) or []
+        reason = validate_board(items, min_items)
+        if reason is None:
+            boards[category] = items
+            tiers[category] = TIER_BROWSER
+            continue
+        if use_browser:
+            print(f"{category} 浏览器抓取结果未通过校验：{reason}")
+        if len(items) > len(boards[category]):
+            boards[category] = items
+        tiers[category] = TIER_PARTIAL if boards[category] else TIER_FAILED
+
+    print("各分类数据来源: " + ", ".join(f"{category}={tiers[category]}" for category in categories))
+    return boards, tiers
@@ -0,0 +1,40 @@
+-- 热搜快照版本表：每个分类每次抓取生成一个版本
+CREATE TABLE IF NOT EXISTS hot_search_snapshots (
+    id BIGSERIAL PRIMARY KEY,
+    category VARCHAR(50) NOT NULL,
+    item_count INTEGER NOT NULL DEFAULT 0,
+    captured_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_hot_search_snapshots_category_captured ON hot_search_snapshots(category, captured_at DESC);
+
+-- 热搜历史条目表：只追加，按抓取时间按月分区
+CREATE TABLE IF NOT EXISTS hot_search_history (
+    snapshot_id BIGINT NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    rank_num INTEGER NOT NULL,
+    item_id VARCHAR(16),
+    title TEXT NOT NULL,
+    url TEXT,
+    image_url TEXT,
+    hot_index TEXT,
+    captured_at TIMESTAMP NOT NULL
+) PARTITION BY RANGE (captured_at);
+
+-- 兜底分区，月分区由 hot_search_history.py 写入时按需创建
+CREATE TABLE IF NOT EXISTS hot_search_history_default PARTITION OF hot_search_history DEFAULT;
+
+-- 索引
+CREATE INDEX IF NOT EXISTS idx_hot_search_history_captured_at ON hot_search_history USING BRIN (captured_at);
+CREATE INDEX IF NOT EXISTS idx_hot_search_history_snapshot ON hot_search_history(snapshot_id, rank_num);
+
+-- 条目 ID（标准化标题的哈希），用于按 ID 查找已跌出榜单的话题；旧表升级时补充该列
+ALTER TABLE hot_search_history ADD COLUMN IF NOT EXISTS item_id VARCHAR(16);
+CREATE INDEX IF NOT EXISTS idx_hot_search_history_item ON hot_search_history(item_id, captured_at DESC);
+
+-- 当前榜单指针：每个分类指向最新的快照版本
+CREATE TABLE IF NOT EXISTS hot_search_latest (
+    category VARCHAR(50) PRIMARY KEY,
+    snapshot_id BIGINT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
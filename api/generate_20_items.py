@@ -1,24 +1,10 @@
-import psycopg2
-from datetime import datetime
+from hot_search_history import save_hot_search_board
 
 def generate_20_items():
     """
     生成20条百度热搜测试数据
     """
     try:
-        # 连接数据库
-        conn = psycopg2.connect(
-            host="localhost",
-            database="demo",
-            user="postgres",
-            password="admin"
-        )
-        cur = conn.cursor()
-        
-        # 清空现有数据
-        cur.execute("DELETE FROM baidu_hot_search")
-        print("已清空现有数据")
-        
         # 生成20条测试数据
         test_data = [
             {"rank": 1, "title": "冰天雪地也是金山银山", "url": "https://top.baidu.com/board?tab=realtime", "image_url": "https://img.baidu.com/img1.jpg", "hot_index": "7904144"},
@@ -43,24 +29,13 @@ def generate_20_items():
             {"rank": 20, "title": "文化遗产保护", "url": "https://top.baidu.com/board?tab=realtime", "image_url": "https://img.baidu.com/img20.jpg", "hot_index": "6050000"}
         ]
         
-        # 插入测试数据
-        for item in test_data:
-            cur.execute(
-                "INSERT INTO baidu_hot_search (title, url, image_url, hot_index, rank_num, created_at) VALUES (%s, %s, %s, %s, %s, %s)",
-                (item["title"], item["url"], item["image_url"], item["hot_index"], item["rank"], datetime.now())
-            )
-        
-        conn.commit()
-        cur.close()
-        conn.close()
+        # 作为热搜分类的新快照写入，写完后才切换当前榜单
+        saved = save_hot_search_board(test_data)
         
-        print(f"成功插入 {len(test_data)} 条测试数据")
+        print(f"成功插入 {saved} 条测试数据")
         
     except Exception as e:
         print(f"生成测试数据失败: {e}")
-        if 'conn' in locals():
-            conn.rollback()
-            conn.close()
 
 if __name__ == "__main__":
     generate_20_items()
\ No newline at end of file
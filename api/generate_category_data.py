@@ -1,24 +1,10 @@
-import psycopg2
-from datetime import datetime
+from hot_search_history import save_hot_search_board
 
 def generate_category_data():
     """
     生成三个分类的百度热搜测试数据
     """
     try:
-        # 连接数据库
-        conn = psycopg2.connect(
-            host="localhost",
-            database="demo",
-            user="postgres",
-            password="admin"
-        )
-        cur = conn.cursor()
-        
-        # 清空现有数据
-        cur.execute("DELETE FROM baidu_hot_search")
-        print("已清空现有数据")
-        
         # 生成三个分类的测试数据
         categories = [
             {
@@ -56,27 +42,14 @@ def generate_category_data():
             }
         ]
         
-        # 插入测试数据
-        total_inserted = 0
-        for category in categories:
-            for item in category["items"]:
-                cur.execute(
-                    "INSERT INTO baidu_hot_search (title, url, image_url, hot_index, rank_num, category, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                    (item["title"], item["url"], item["image_url"], item["hot_index"], item["rank"], category["name"], datetime.now())
-                )
-                total_inserted += 1
-        
-        conn.commit()
-        cur.close()
-        conn.close()
+        # 各分类作为新快照在同一个事务中写入，写完后才切换当前榜单
+        data = [dict(item, category=category["name"]) for category in categories for item in category["items"]]
+        total_inserted = save_hot_search_board(data)
         
         print(f"成功插入 {total_inserted} 条测试数据，涵盖 {len(categories)} 个分类")
         
     except Exception as e:
         print(f"生成测试数据失败: {e}")
-        if 'conn' in locals():
-            conn.rollback()
-            conn.close()
 
 if __name__ == "__main__":
     generate_category_data()
\ No newline at end of file
@@ -1,5 +1,6 @@
 import psycopg2
-from datetime import datetime
+from db_config import get_connection_params
+from hot_search_history import save_hot_search_board
 
 def generate_hot_search_data():
     """
@@ -59,39 +60,10 @@ def generate_hot_search_data():
 
 def insert_hot_search_data(data):
     """
-    将热搜数据插入到数据库
+    将热搜数据按分类追加为新的快照版本，并更新当前榜单指针
     """
-    conn = None
-    try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="demo",
-            user="postgres",
-            password="admin"
-        )
-        cur = conn.cursor()
-        
-        # 清空现有数据
-        cur.execute("DELETE FROM baidu_hot_search")
-        
-        # 插入新数据
-        for item in data:
-            cur.execute(
-                "INSERT INTO baidu_hot_search (title, url, rank_num, created_at) VALUES (%s, %s, %s, %s)",
-                (item["title"], item["url"], item["rank"], datetime.now())
-            )
-        
-        conn.commit()
-        cur.close()
-        print(f"成功插入 {len(data)} 条热搜数据")
-        
-    except Exception as e:
-        print(f"插入数据失败: {e}")
-        if conn:
-            conn.rollback()
-    finally:
-        if conn:
-            conn.close()
+    saved = save_hot_search_board(data)
+    print(f"成功插入 {saved} 条热搜数据")
 
 def main():
     """
@@ -105,16 +77,11 @@ def main():
     insert_hot_search_data(hot_search_data)
     
     # 验证数据
-    conn = psycopg2.connect(
-        host="localhost",
-        database="demo",
-        user="postgres",
-        password="admin"
-    )
+    conn = psycopg2.connect(**get_connection_params())
     cur = conn.cursor()
-    cur.execute("SELECT COUNT(*) FROM baidu_hot_search")
+    cur.execute("SELECT COALESCE(SUM(s.item_count), 0) FROM hot_search_latest l JOIN hot_search_snapshots s ON s.id = l.snapshot_id")
     count = cur.fetchone()[0]
-    print(f"数据库中现有 {count} 条数据")
+    print(f"当前榜单共有 {count} 条数据")
     cur.close()
     conn.close()
 
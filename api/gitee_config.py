@@ -4,6 +4,10 @@ GITEE_CLIENT_ID = os.getenv("GITEE_CLIENT_ID", "48f86608a1b09bb3fb5dff0ab480458e
 GITEE_CLIENT_SECRET = os.getenv("GITEE_CLIENT_SECRET", "87ca939fa48bd388eb88527bd5e3f2b3f22d9c02b3bb5bbcccf57ef9605d410d")
 GITEE_REDIRECT_URI = os.getenv("GITEE_REDIRECT_URI", "http://localhost:3006/auth/gitee/callback")
 
-GITEE_AUTH_URL = "https://gitee.com/oauth/authorize"
-GITEE_TOKEN_URL = "https://gitee.com/oauth/token"
-GITEE_USER_API = "https://gitee.com/api/v5/user"
+# Gitee 站点地址，可指向本地替身服务器（upstream_standin.py）以离线回放
+GITEE_BASE_URL = os.getenv("GITEE_BASE_URL", "https://gitee.com").rstrip("/")
+
+GITEE_AUTH_URL = f"{GITEE_BASE_URL}/oauth/authorize"
+GITEE_TOKEN_URL = f"{GITEE_BASE_URL}/oauth/token"
+GITEE_USER_API = f"{GITEE_BASE_URL}/api/v5/user"
+GITEE_EMAILS_API = f"{GITEE_BASE_URL}/api/v5/user/emails"
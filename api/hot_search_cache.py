@@ -0,0 +1,690 @@
+"""
+百度热搜快照缓存模块
+后台定时刷新各分类的热搜快照，接口统一从内存快照读取，
+快照过期后先返回旧数据，同时在后台重新抓取（stale-while-revalidate）
+"""
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Tuple
+from baidu_hot_spider import HOT_SEARCH_CATEGORIES
+from circuit_breaker import CircuitBreaker
+from compression import precompress
+from hot_search_store import MemoryStore, SnapshotStore
+from item_id import make_item_id
+from single_flight import SingleFlight
+
+
+# 默认快照有效期（秒），可通过 HOT_SEARCH_TTL 覆盖
+DEFAULT_TTL = int(os.getenv("HOT_SEARCH_TTL", "300"))
+
+# 后台刷新任务的检查间隔（秒）
+REFRESH_CHECK_INTERVAL = 5
+
+# 前端默认的每页数量，新快照生成时预先渲染并压缩第一页
+DEFAULT_PAGE_SIZE = 20
+
+# 每个快照最多缓存的预渲染分页数量，防止任意分页参数撑爆内存
+MAX_RENDERED_PAGES = 256
+
+# 每个分类保留的最近快照数量，客户端版本早于这些快照时返回全量数据
+CHANGES_HISTORY_DEPTH = 16
+
+# 刷新租约有效期（秒），持有者崩溃后其他 worker 最多等待这么久接手刷新
+REFRESH_LEASE_TTL = 30
+
+# 抓取失败后不再请求上游的时间（秒），期间直接使用旧快照
+NEGATIVE_TTL = int(os.getenv("HOT_SEARCH_NEGATIVE_TTL", "15"))
+
+# 没有快照且其他 worker 正在刷新时，同步等待其结果的最长时间（秒）
+LEASE_WAIT_TIMEOUT = 10
+
+
+def get_category_ttl(category: str) -> int:
+    """
+    获取分类的快照有效期
+    优先使用 HOT_SEARCH_TTL_<分类> 环境变量，例如 HOT_SEARCH_TTL_REALTIME=60
+    """
+    return int(os.getenv(f"HOT_SEARCH_TTL_{category.upper()}", str(DEFAULT_TTL)))
+
+
+def format_hot_search_item(item: Dict[str, Any], idx: int, category: str, created_at: str) -> Dict[str, Any]:
+    """将爬虫返回的热搜条目转换为接口格式"""
+    return {
+        "id": make_item_id(item.get("word", "")),
+        "rank": item.get("index", idx),
+        "title": item.get("word", ""),
+        "url": item.get("url", ""),
+        "image_url": item.get("img", ""),
+        "hot_index": item.get("hot_score", ""),
+        "category": category,
+        "created_at": created_at
+    }
+
+
+def encode_json(data: Any) -> bytes:
+    """按 FastAPI JSONResponse 相同的方式编码 JSON"""
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    """根据响应内容生成强 ETag"""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+@dataclass
+class RenderedPage:
+    """预渲染好的响应，encodings 为预压缩版本（编码 -> 压缩后的字节）"""
+    body: bytes
+    etag: str
+    encodings: Dict[str, bytes] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def build(cls, body: bytes, precompressed: bool = True) -> "RenderedPage":
+        """
+        生成 ETag 和 gzip / brotli 预压缩版本，之后的请求不再消耗压缩 CPU
+        precompressed 为 False 时不预压缩（只用一次的响应），由 negotiated_response 按请求的编码用较快的级别即时压缩
+        """
+        return cls(body=body, etag=make_etag(body), encodings=precompress(body) if precompressed else {})
+
+
+@dataclass
+class HotSearchSnapshot:
+    """某个分类在某一时刻的热搜快照"""
+    category: str
+    items: List[Dict[str, Any]]
+    fetched_at: float
+    created_at: str
+    content_hash: Optional[str] = None
+    checked_at: float = 0
+    version: int = 0
+    pages: Dict[tuple, RenderedPage] = field(default_factory=dict, repr=False)
+    changes: Dict[Optional[int], RenderedPage] = field(default_factory=dict, repr=False)
+    index: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        if not self.checked_at:
+            self.checked_at = self.fetched_at
+        # 条目 ID 到位置的索引，标题重复时保留排名靠前的条目
+        for pos in range(len(self.items) - 1, -1, -1):
+            self.index[make_item_id(self.items[pos].get("word", ""))] = pos
+
+    def find_item(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """按条目 ID 查找，返回接口格式的条目"""
+        pos = self.index.get(item_id)
+        if pos is None:
+            return None
+        return format_hot_search_item(self.items[pos], pos + 1, self.category, self.created_at)
+
+    def age(self) -> float:
+        """距上次确认快照内容为最新的秒数"""
+        return time.time() - self.checked_at
+
+    def touch(self):
+        """上游内容没有变化，只刷新确认时间，保留已渲染的分页"""
+        self.checked_at = time.time()
+
+    def to_record(self) -> Dict[str, Any]:
+        """转换为共享存储中的记录，不包含预渲染的响应"""
+        return {
+            "category": self.category,
+            "items": self.items,
+            "fetched_at": self.fetched_at,
+            "created_at": self.created_at,
+            "content_hash": self.content_hash,
+            "checked_at": self.checked_at,
+            "version": self.version
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "HotSearchSnapshot":
+        """从共享存储中的记录还原快照"""
+        return cls(
+            category=record["category"],
+            items=record["items"],
+            fetched_at=record["fetched_at"],
+            created_at=record["created_at"],
+            content_hash=record.get("content_hash"),
+            checked_at=record.get("checked_at", 0),
+            version=record["version"]
+        )
+
+    def get_page(self, page: int, page_size: int) -> RenderedPage:
+        """
+        获取分页的预渲染响应
+        同一快照的同一分页只编码一次，之后直接返回缓存的字节；
+        超过 MAX_RENDERED_PAGES 不再缓存的分页每次请求都会重新渲染，不做最高级别的预压缩
+        """
+        key = (page, page_size)
+        rendered = self.pages.get(key)
+        if rendered is None:
+            cacheable = len(self.pages) < MAX_RENDERED_PAGES
+            rendered = self._render_page(page, page_size, precompressed=cacheable)
+            if cacheable:
+                self.pages[key] = rendered
+        return rendered
+
+    def _render_page(self, page: int, page_size: int, precompressed: bool = True) -> RenderedPage:
+        total = len(self.items)
+        offset = (page - 1) * page_size
+        page_data = self.items[offset:offset + page_size] if offset >= 0 else []
+        body = encode_json({
+            "data": [
+                format_hot_search_item(item, idx, self.category, self.created_at)
+                for idx, item in enumerate(page_data, start=offset + 1)
+            ],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total + page_size - 1) // page_size if page_size > 0 else 0,
+            "version": self.version
+        })
+        return RenderedPage.build(body, precompressed)
+
+    def get_changes(self, since: Optional[int], base: Optional["HotSearchSnapshot"]) -> RenderedPage:
+        """
+        获取从客户端版本 since 到本快照的变化，每个 since 只计算并编码一次
+
+        Args:
+            since: 客户端持有的版本号
+            base: 版本号为 since 的旧快照，已不在内存中时为 None，此时返回全量数据
+        """
+        key = since if (base is not None or since == self.version) else None
+        rendered = self.changes.get(key)
+        if rendered is None:
+            if key is None:
+                data = self._render_full_changes()
+            elif since == self.version:
+                data = self._render_diff(since, [], [], [])
+            else:
+                data = self._render_diff(since, *diff_snapshots(base, self))
+            body = encode_json(data)
+            rendered = RenderedPage.build(body)
+            self.changes[key] = rendered
+        return rendered
+
+    def _render_full_changes(self) -> Dict[str, Any]:
+        """全量数据与客户端版本无关，所有过旧的版本共用同一份响应"""
+        return {
+            "category": self.category,
+            "version": self.version,
+            "since": None,
+            "full": True,
+            "data": [
+                format_hot_search_item(item, idx, self.category, self.created_at)
+                for idx, item in enumerate(self.items, start=1)
+            ],
+            "total": len(self.items)
+        }
+
+    def _render_diff(self, since: int, inserted: list, removed: list, updated: list) -> Dict[str, Any]:
+        return {
+            "category": self.category,
+            "version": self.version,
+            "since": since,
+            "full": False,
+            "inserted": inserted,
+            "removed": removed,
+            "updated": updated,
+            "total": len(self.items)
+        }
+
+
+def diff_snapshots(old: HotSearchSnapshot, new: HotSearchSnapshot) -> Tuple[list, list, list]:
+    """
+    按标题比较两个快照
+
+    Returns:
+        (新增的条目, 移除的条目, 排名或热度等字段变化的条目)
+    """
+    old_by_title = {
+        item.get("word", ""): (item.get("index", idx), item)
+        for idx, item in enumerate(old.items, start=1)
+    }
+    new_titles = set()
+    inserted, updated = [], []
+    for idx, item in enumerate(new.items, start=1):
+        title = item.get("word", "")
+        new_titles.add(title)
+        formatted = format_hot_search_item(item, idx, new.category, new.created_at)
+        previous = old_by_title.get(title)
+        if previous is None:
+            inserted.append(formatted)
+            continue
+        old_rank, old_item = previous
+        if (old_rank, old_item.get("hot_score"), old_item.get("url"), old_item.get("img")) != \
+                (formatted["rank"], item.get("hot_score"), item.get("url"), item.get("img")):
+            formatted["previous_rank"] = old_rank
+            updated.append(formatted)
+
+    removed = [
+        {"id": make_item_id(title), "title": title, "rank": rank}
+        for title, (rank, _) in old_by_title.items()
+        if title not in new_titles
+    ]
+    return inserted, removed, updated
+
+
+# 抓取函数的返回值：(热搜数据列表或 None, 内容哈希)
+FetchResult = Tuple[Optional[List[Dict[str, Any]]], Optional[str]]
+
+
+class HotSearchCache:
+    """热搜快照缓存，每个分类保存一份最新快照"""
+
+    def __init__(
+        self,
+        fetcher: Callable[[str, Optional[str]], FetchResult],
+        categories: List[str] = None,
+        ttls: Dict[str, int] = None,
+        async_fetcher: Callable[[str, Optional[str]], Awaitable[FetchResult]] = None,
+        store: SnapshotStore = None
+    ):
+        """
+        Args:
+            fetcher: 条件抓取函数，参数为 (分类, 当前快照的内容哈希)，
+                返回 (热搜数据列表, 内容哈希)；内容未变化时列表为 None，抓取失败时为空列表
+            categories: 需要缓存的分类，默认为全部分类
+            ttls: 各分类的有效期（秒），未指定的分类从环境变量读取
+            async_fetcher: 可选的异步条件抓取函数，后台刷新时优先使用
+            store: 快照共享存储，默认为进程内存储；多个 worker 共用同一存储时，
+                只有持有刷新租约的 worker 抓取上游，其余 worker 从存储读取同一版本的快照
+        """
+        self.fetcher = fetcher
+        self.async_fetcher = async_fetcher
+        self.categories = list(categories or HOT_SEARCH_CATEGORIES)
+        self.ttls = {cat: get_category_ttl(cat) for cat in self.categories}
+        if ttls:
+            self.ttls.update(ttls)
+        self._snapshots: Dict[str, HotSearchSnapshot] = {}
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_stats = {"refreshes": 0, "updated": 0, "unchanged": 0, "failed": 0, "skipped": 0}
+        self._listeners: List[Tuple[Callable[[HotSearchSnapshot], None], bool]] = []
+        self._recent: Dict[str, deque] = {}
+        self._last_version = 0
+        self.store = store or MemoryStore()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._breakers: Dict[str, CircuitBreaker] = {cat: CircuitBreaker() for cat in self.categories}
+        self._failed_at: Dict[str, float] = {}
+
+    def add_listener(self, listener: Callable[[HotSearchSnapshot], None], local_only: bool = False):
+        """
+        注册新快照监听函数，每次出现内容有变化的新快照后调用
+        监听函数可能在事件循环中被调用，耗时操作需自行放到后台执行
+
+        Args:
+            local_only: 为 True 时只对本进程抓取的快照调用（如写入历史表，避免多个 worker 重复写入），
+                否则从共享存储同步到的快照也会调用（如推送给本进程的客户端）
+        """
+        self._listeners.append((listener, local_only))
+
+    def get_ttl(self, category: str) -> int:
+        return self.ttls.get(category, DEFAULT_TTL)
+
+    def is_stale(self, snapshot: HotSearchSnapshot) -> bool:
+        return snapshot.age() > self.get_ttl(snapshot.category)
+
+    def _breaker(self, category: str) -> CircuitBreaker:
+        return self._breakers[category]
+
+    def is_degraded(self, category: str) -> bool:
+        """上游不可用：最近抓取失败（负缓存期内）或熔断器处于熔断状态"""
+        if category not in self._breakers:
+            return False
+        failed_at = self._failed_at.get(category)
+        if failed_at is not None and time.time() - failed_at < NEGATIVE_TTL:
+            return True
+        return self._breaker(category).is_open()
+
+    def _begin_fetch(self, category: str) -> bool:
+        """是否请求上游，负缓存期内或熔断时跳过，直接沿用旧快照"""
+        if self.is_degraded(category) or not self._breaker(category).allow():
+            with self._lock:
+                self._refresh_stats["skipped"] += 1
+            return False
+        return True
+
+    def _record_fetch(self, category: str, items: Optional[List[Dict[str, Any]]]):
+        """记录抓取结果，空列表视为失败"""
+        breaker = self._breaker(category)
+        if items is not None and not items:
+            self._failed_at[category] = time.time()
+            breaker.record_failure()
+        else:
+            self._failed_at.pop(category, None)
+            breaker.record_success()
+
+    def peek(self, category: str) -> Optional[HotSearchSnapshot]:
+        """读取当前快照，不触发任何刷新"""
+        return self._snapshots.get(category)
+
+    def get_snapshot(self, category: str) -> Optional[HotSearchSnapshot]:
+        """
+        获取分类快照
+        没有快照时同步抓取一次；快照过期时直接返回旧快照并在后台刷新；
+        未知分类直接返回 None，不抓取上游，也不在缓存、共享存储或熔断器中留下记录
+        """
+        if category not in self.categories:
+            return None
+        snapshot = self._snapshots.get(category)
+        if snapshot is None:
+            return self.refresh(category)
+        if self.is_stale(snapshot):
+            self._schedule_refresh(category)
+        return snapshot
+
+    def refresh(self, category: str) -> Optional[HotSearchSnapshot]:
+        """
+        抓取分类的最新数据并替换快照，抓取失败时保留旧快照
+        同一分类的并发刷新会被合并为一次上游抓取
+        """
+        if category not in self.categories:
+            return None
+        return self._flight.do(category, self._refresh_shared, category)
+
+    async def refresh_async(self, category: str) -> Optional[HotSearchSnapshot]:
+        """refresh 的异步版本，与同步调用共享同一个合并层"""
+        if category not in self.categories:
+            return None
+        if self.async_fetcher is None:
+            return await self._flight.do_async(category, self._refresh_shared, category)
+        return await self._flight.do_async(category, self._refresh_shared_async, category)
+
+    def _lease_name(self, category: str) -> str:
+        return f"refresh_{category}"
+
+    def _adopt_fresh(self, category: str) -> Optional[HotSearchSnapshot]:
+        """其他 worker 刚刷新过时直接采用共享存储中的快照，不再抓取上游"""
+        snapshot = self.sync_from_store(category)
+        if snapshot is not None and not self.is_stale(snapshot):
+            return snapshot
+        return None
+
+    def _refresh_shared(self, category: str) -> Optional[HotSearchSnapshot]:
+        """持有刷新租约时抓取上游，否则等待持有者写入共享存储"""
+        lease = self._lease_name(category)
+        if not self.store.acquire_lease(lease, self.owner, REFRESH_LEASE_TTL):
+            return self._wait_for_store(category)
+        try:
+            return self._adopt_fresh(category) or self._fetch_and_store(category)
+        finally:
+            self.store.release_lease(lease, self.owner)
+
+    async def _refresh_shared_async(self, category: str) -> Optional[HotSearchSnapshot]:
+        lease = self._lease_name(category)
+        if not await asyncio.to_thread(self.store.acquire_lease, lease, self.owner, REFRESH_LEASE_TTL):
+            return await asyncio.to_thread(self.sync_from_store, category)
+        try:
+            snapshot = await asyncio.to_thread(self._adopt_fresh, category)
+            return snapshot or await self._fetch_and_store_async(category)
+        finally:
+            await asyncio.to_thread(self.store.release_lease, lease, self.owner)
+
+    def _wait_for_store(self, category: str) -> Optional[HotSearchSnapshot]:
+        """没有本地快照时等待租约持有者的刷新结果，有旧快照时直接返回"""
+        deadline = time.time() + LEASE_WAIT_TIMEOUT
+        snapshot = self.sync_from_store(category)
+        while snapshot is None and time.time() < deadline:
+            time.sleep(0.2)
+            snapshot = self.sync_from_store(category)
+        return snapshot
+
+    def warm_start(self, records: Dict[str, Dict[str, Any]]) -> int:
+        """
+        载入落盘的快照记录作为初始快照，不通知监听函数
+        这些快照通常已过期，第一个请求直接返回它们，同时在后台刷新
+
+        Returns:
+            载入的分类数
+        """
+        loaded = 0
+        for category, record in records.items():
+            if category not in self.categories or category in self._snapshots:
+                continue
+            try:
+                self._install(HotSearchSnapshot.from_record(record))
+                loaded += 1
+            except (KeyError, TypeError) as e:
+                print(f"载入 {category} 热搜快照失败: {e}")
+        if loaded:
+            print(f"从快照文件预热 {loaded} 个分类的热搜数据")
+        return loaded
+
+    def sync_from_store(self, category: str) -> Optional[HotSearchSnapshot]:
+        """
+        从共享存储同步分类快照
+        版本号相同时只更新确认时间，保留本进程已渲染的分页；版本不同时载入新快照
+        """
+        if category not in self.categories:
+            return None
+        current = self._snapshots.get(category)
+        try:
+            meta = self.store.peek_meta(category)
+            if meta is None:
+                return current
+            version, checked_at = meta
+            if current is not None and current.version == version:
+                current.checked_at = max(current.checked_at, checked_at)
+                return current
+            if current is not None and current.version > version:
+                return current
+            record = self.store.load(category)
+        except Exception as e:
+            print(f"读取共享热搜快照失败: {e}")
+            return current
+        if record is None:
+            return current
+        snapshot = HotSearchSnapshot.from_record(record)
+        self._install(snapshot)
+        self._notify(snapshot, local=False)
+        return snapshot
+
+    def _install(self, snapshot: HotSearchSnapshot):
+        snapshot.get_page(1, DEFAULT_PAGE_SIZE)
+        with self._lock:
+            self._last_version = max(self._last_version, snapshot.version)
+            self._snapshots[snapshot.category] = snapshot
+            self._recent.setdefault(snapshot.category, deque(maxlen=CHANGES_HISTORY_DEPTH)).append(snapshot)
+
+    def _notify(self, snapshot: HotSearchSnapshot, local: bool):
+        for listener, local_only in self._listeners:
+            if local_only and not local:
+                continue
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"热搜快照监听函数执行失败: {e}")
+
+    def _known_hash(self, category: str) -> Optional[str]:
+        snapshot = self._snapshots.get(category)
+        return snapshot.content_hash if snapshot else None
+
+    def _fetch_and_store(self, category: str) -> Optional[HotSearchSnapshot]:
+        if not self._begin_fetch(category):
+            return self._snapshots.get(category)
+        try:
+            items, content_hash = self.fetcher(category, self._known_hash(category))
+        except Exception as e:
+            print(f"刷新 {category} 热搜快照失败: {e}")
+            items, content_hash = [], None
+        self._record_fetch(category, items)
+        return self._store(category, items, content_hash)
+
+    async def _fetch_and_store_async(self, category: str) -> Optional[HotSearchSnapshot]:
+        if not self._begin_fetch(category):
+            return self._snapshots.get(category)
+        try:
+            items, content_hash = await self.async_fetcher(category, self._known_hash(category))
+        except Exception as e:
+            print(f"刷新 {category} 热搜快照失败: {e}")
+            items, content_hash = [], None
+        self._record_fetch(category, items)
+        return self._store(category, items, content_hash)
+
+    def _store(
+        self, category: str, items: Optional[List[Dict[str, Any]]], content_hash: Optional[str]
+    ) -> Optional[HotSearchSnapshot]:
+        """
+        用抓取结果生成新快照
+        内容未变化时只刷新旧快照的确认时间，结果为空时保留旧快照
+        """
+        current = self._snapshots.get(category)
+        with self._lock:
+            self._refresh_stats["refreshes"] += 1
+            if items is None and current is not None:
+                self._refresh_stats["unchanged"] += 1
+            elif not items:
+                self._refresh_stats["failed"] += 1
+            else:
+                self._refresh_stats["updated"] += 1
+
+        if items is None and current is not None:
+            current.touch()
+            self._save_to_store(category, lambda: self.store.touch(category, current.version, current.checked_at))
+            return current
+        if not items:
+            return current
+
+        now = time.time()
+        snapshot = HotSearchSnapshot(
+            category=category,
+            items=items,
+            fetched_at=now,
+            created_at=datetime.fromtimestamp(now).strftime('%Y-%m-%dT%H:%M:%S'),
+            content_hash=content_hash
+        )
+        with self._lock:
+            # 版本号取毫秒时间戳，保证进程重启后依然单调递增
+            self._last_version = max(int(now * 1000), self._last_version + 1)
+            snapshot.version = self._last_version
+        self._install(snapshot)
+        self._save_to_store(category, lambda: self.store.save(category, snapshot.to_record()))
+        print(f"刷新 {category} 热搜快照，共 {len(items)} 条数据")
+        self._notify(snapshot, local=True)
+        return snapshot
+
+    def _save_to_store(self, category: str, write: Callable[[], None]):
+        """写入共享存储，失败时只影响其他 worker，本进程继续使用内存快照"""
+        try:
+            write()
+        except Exception as e:
+            print(f"写入共享热搜快照 {category} 失败: {e}")
+
+    def get_changes(self, category: str, since: Optional[int]) -> Optional[RenderedPage]:
+        """
+        获取分类从客户端版本 since 到最新快照的变化
+        since 不在最近保留的快照中时返回全量数据
+        """
+        snapshot = self.get_snapshot(category)
+        if snapshot is None:
+            return None
+        base = None
+        if since != snapshot.version:
+            base = self.get_recent(category, since)
+        return snapshot.get_changes(since, base)
+
+    def get_batch(self, categories: List[str], page_size: int) -> RenderedPage:
+        """
+        多个分类第一页的合并响应，格式为 {"分类": 该分类 /api/hot-search 的响应, ...}
+        直接拼接各分类预渲染好的分页字节，不重新编码条目；未知或暂无数据的分类不出现在结果中
+        """
+        parts, etags = [], []
+        for category in categories:
+            if category not in self.categories:
+                continue
+            snapshot = self.get_snapshot(category)
+            if snapshot is None or not snapshot.items:
+                continue
+            rendered = snapshot.get_page(1, page_size)
+            parts.append(encode_json(category) + b":" + rendered.body)
+            etags.append(category + rendered.etag)
+        body = b"{" + b",".join(parts) + b"}"
+        return RenderedPage(body=body, etag=make_etag("".join(etags).encode()))
+
+    def find_item(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """在所有分类的当前快照中按条目 ID 查找，不触发刷新"""
+        for category in self.categories:
+            snapshot = self._snapshots.get(category)
+            if snapshot is not None:
+                item = snapshot.find_item(item_id)
+                if item is not None:
+                    return item
+        return None
+
+    def get_recent(self, category: str, version: Optional[int]) -> Optional[HotSearchSnapshot]:
+        """在最近保留的快照中查找指定版本"""
+        if version is None:
+            return None
+        for snapshot in list(self._recent.get(category, ())):
+            if snapshot.version == version:
+                return snapshot
+        return None
+
+    def _schedule_refresh(self, category: str):
+        """在后台线程中刷新分类，已有刷新在进行或上游不可用时不再启动新线程"""
+        if self._flight.in_flight(category) or self.is_degraded(category):
+            return
+        threading.Thread(target=self.refresh, args=(category,), daemon=True).start()
+
+    def _due_categories(self) -> List[str]:
+        """需要刷新的分类：没有快照或快照已过期，且上游未处于不可用状态"""
+        due = []
+        for category in self.categories:
+            if self.is_degraded(category):
+                continue
+            snapshot = self._snapshots.get(category)
+            if snapshot is None or self.is_stale(snapshot):
+                due.append(category)
+        return due
+
+    async def run(self, check_interval: float = REFRESH_CHECK_INTERVAL):
+        """
+        后台刷新循环，定期同步其他 worker 写入的快照，并发刷新所有到期的分类
+        """
+        while True:
+            for category in self.categories:
+                await asyncio.to_thread(self.sync_from_store, category)
+            due = self._due_categories()
+            if due:
+                await asyncio.gather(*(self.refresh_async(cat) for cat in due))
+            await asyncio.sleep(check_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存统计：各分类快照年龄、刷新结果（含内容未变化的空刷新）、上游请求合并情况及熔断器状态"""
+        with self._lock:
+            refresh = dict(self._refresh_stats)
+        return {
+            "snapshots": {
+                cat: {"items": len(snap.items), "age": round(snap.age(), 1), "version": snap.version}
+                for cat, snap in self._snapshots.items()
+            },
+            "refresh": refresh,
+            "upstream": self._flight.get_stats(),
+            "store": type(self.store).__name__,
+            "breakers": {cat: breaker.get_state() for cat, breaker in self._breakers.items()}
+        }
+
+    def start(self):
+        """在当前事件循环中启动后台刷新任务"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        """停止后台刷新任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
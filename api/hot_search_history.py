@@ -0,0 +1,239 @@
+"""
+热搜快照历史模块
+每次抓取按分类追加一个快照版本，历史条目通过 COPY 批量写入按月分区的表，
+当前榜单只是 hot_search_latest 中指向最新版本的指针
+新版本的条目写完后才在同一事务中切换指针，读取方不会看到写了一半或被清空的榜单；
+所有写热搜数据的脚本都通过 save_hot_search_board 写入
+"""
+import csv
+import io
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+import psycopg2
+from db_config import get_connection_params
+from item_id import make_item_id
+
+
+HISTORY_COLUMNS = ("snapshot_id", "category", "rank_num", "item_id", "title", "url", "image_url", "hot_index", "captured_at")
+
+
+def _month_range(captured_at: datetime):
+    """抓取时间所在月份的分区范围 [本月1日, 下月1日)"""
+    start = captured_at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if start.month == 12:
+        end = start.replace(year=start.year + 1, month=1)
+    else:
+        end = start.replace(month=start.month + 1)
+    return start, end
+
+
+class HotSearchHistory:
+    """热搜快照历史数据库操作类"""
+
+    def __init__(self):
+        self._partitions = set()
+
+    def get_connection(self):
+        """获取数据库连接"""
+        try:
+            return psycopg2.connect(**get_connection_params())
+        except Exception as e:
+            print(f"数据库连接错误: {e}")
+            return None
+
+    def _ensure_partition(self, cur, captured_at: datetime):
+        """按需创建抓取时间所在月份的分区"""
+        start, end = _month_range(captured_at)
+        name = f"hot_search_history_{start:%Y_%m}"
+        if name in self._partitions:
+            return
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF hot_search_history "
+            f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        )
+        self._partitions.add(name)
+
+    def _copy_items(self, cur, snapshots: List[tuple], captured_at: datetime):
+        """
+        用一次 COPY 批量写入多个快照的全部条目
+
+        Args:
+            snapshots: (快照版本号, 分类, 条目列表) 的列表
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for snapshot_id, category, items in snapshots:
+            for item in items:
+                writer.writerow([
+                    snapshot_id,
+                    category,
+                    item["rank"],
+                    make_item_id(item["title"]),
+                    item["title"],
+                    item.get("url", ""),
+                    item.get("image_url", ""),
+                    item.get("hot_index", ""),
+                    captured_at.isoformat()
+                ])
+        buffer.seek(0)
+        cur.copy_expert(
+            f"COPY hot_search_history ({', '.join(HISTORY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+
+    def save_snapshot(self, category: str, items: List[Dict[str, Any]], captured_at: datetime = None) -> Optional[int]:
+        """
+        追加一个分类快照并把当前榜单指针指向它
+
+        Args:
+            category: 分类
+            items: 热搜条目，字段为 rank, title, url, image_url, hot_index
+            captured_at: 抓取时间，默认为当前时间
+
+        Returns:
+            新快照的版本号，失败时返回 None
+        """
+        return self.save_snapshots({category: items}, captured_at).get(category)
+
+    def save_snapshots(self, boards: Dict[str, List[Dict[str, Any]]], captured_at: datetime = None) -> Dict[str, int]:
+        """
+        在一个事务中为多个分类各追加一个快照，全部条目用一次 COPY 写入，最后一起切换当前榜单指针
+        任何一步失败都整体回滚，各分类仍指向原来的版本
+
+        Args:
+            boards: 分类 -> 热搜条目，空列表的分类跳过
+
+        Returns:
+            分类 -> 新快照的版本号，失败时返回空字典
+        """
+        boards = {category: items for category, items in boards.items() if items}
+        if not boards:
+            return {}
+        captured_at = captured_at or datetime.now()
+        conn = self.get_connection()
+        if not conn:
+            return {}
+
+        try:
+            cur = conn.cursor()
+            self._ensure_partition(cur, captured_at)
+            snapshots = []
+            for category, items in boards.items():
+                cur.execute(
+                    "INSERT INTO hot_search_snapshots (category, item_count, captured_at) VALUES (%s, %s, %s) RETURNING id",
+                    (category, len(items), captured_at)
+                )
+                snapshots.append((cur.fetchone()[0], category, items))
+            self._copy_items(cur, snapshots, captured_at)
+            cur.executemany("""
+                INSERT INTO hot_search_latest (category, snapshot_id, updated_at)
+                VALUES (%s, %s, CURRENT_TIMESTAMP)
+                ON CONFLICT (category) DO UPDATE SET
+                    snapshot_id = EXCLUDED.snapshot_id,
+                    updated_at = CURRENT_TIMESTAMP
+            """, [(category, snapshot_id) for snapshot_id, category, _ in snapshots])
+            conn.commit()
+            cur.close()
+            return {category: snapshot_id for snapshot_id, category, _ in snapshots}
+        except Exception as e:
+            print(f"保存热搜快照失败: {e}")
+            conn.rollback()
+            self._partitions.clear()
+            return {}
+        finally:
+            conn.close()
+
+    def save_board(self, data: List[Dict[str, Any]], captured_at: datetime = None) -> int:
+        """
+        按分类拆分热搜数据，每个分类追加一个快照，所有分类在同一个事务中切换
+
+        Returns:
+            成功写入的条目数
+        """
+        by_category: Dict[str, List[Dict[str, Any]]] = {}
+        for item in data:
+            by_category.setdefault(item.get("category") or "realtime", []).append(item)
+
+        saved = self.save_snapshots(by_category, captured_at)
+        return sum(len(by_category[category]) for category in saved)
+
+    def _fetch_items(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        conn = self.get_connection()
+        if not conn:
+            return []
+        try:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+            cur.close()
+            return [
+                {
+                    "id": row[0] or make_item_id(row[2]),
+                    "rank": row[1],
+                    "title": row[2],
+                    "url": row[3] or "",
+                    "image_url": row[4] or "",
+                    "hot_index": row[5] or "",
+                    "category": row[6],
+                    "created_at": row[7].isoformat() if hasattr(row[7], 'isoformat') else str(row[7])
+                }
+                for row in rows
+            ]
+        except Exception as e:
+            print(f"查询热搜历史失败: {e}")
+            return []
+        finally:
+            conn.close()
+
+    def get_board_at(self, category: str, at: datetime) -> List[Dict[str, Any]]:
+        """
+        获取分类在某一时刻的榜单：取该时刻之前最近的一个快照版本
+        """
+        return self._fetch_items("""
+            SELECT h.item_id, h.rank_num, h.title, h.url, h.image_url, h.hot_index, h.category, h.captured_at
+            FROM (
+                SELECT id, captured_at FROM hot_search_snapshots
+                WHERE category = %s AND captured_at <= %s
+                ORDER BY captured_at DESC
+                LIMIT 1
+            ) s
+            JOIN hot_search_history h ON h.snapshot_id = s.id AND h.captured_at = s.captured_at
+            ORDER BY h.rank_num
+        """, (category, at))
+
+    def get_latest_board(self, category: str) -> List[Dict[str, Any]]:
+        """获取分类当前榜单（最新快照版本）"""
+        return self._fetch_items("""
+            SELECT h.item_id, h.rank_num, h.title, h.url, h.image_url, h.hot_index, h.category, h.captured_at
+            FROM hot_search_latest l
+            JOIN hot_search_snapshots s ON s.id = l.snapshot_id
+            JOIN hot_search_history h ON h.snapshot_id = s.id AND h.captured_at = s.captured_at
+            WHERE l.category = %s
+            ORDER BY h.rank_num
+        """, (category,))
+
+
+    def get_item(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """按条目 ID 查找该话题最近一次出现在榜单上的记录"""
+        items = self._fetch_items("""
+            SELECT h.item_id, h.rank_num, h.title, h.url, h.image_url, h.hot_index, h.category, h.captured_at
+            FROM hot_search_history h
+            WHERE h.item_id = %s
+            ORDER BY h.captured_at DESC
+            LIMIT 1
+        """, (item_id,))
+        return items[0] if items else None
+
+
+def save_hot_search_board(data: List[Dict[str, Any]]) -> int:
+    """
+    将热搜数据按分类追加为新的快照版本
+
+    Args:
+        data: 热搜数据列表，字段为 rank, title, url, image_url, hot_index, category
+
+    Returns:
+        成功写入的条目数
+    """
+    return HotSearchHistory().save_board(data)
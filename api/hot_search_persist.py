@@ -0,0 +1,68 @@
+"""
+热搜快照落盘模块（冷启动预热）
+每次出现新快照后把各分类的最新快照写入一个本地文件，进程启动时先载入该文件，
+第一个请求不必等待抓取百度；安装了 msgpack 时使用 msgpack 格式，否则使用 JSON
+"""
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _default_directory() -> str:
+    return os.getenv("HOT_SEARCH_SNAPSHOT_DIR") or tempfile.gettempdir()
+
+
+class SnapshotPersistence:
+    """各分类最新快照的本地文件，记录格式与共享存储相同"""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or _default_directory()
+        ext = "msgpack" if msgpack is not None else "json"
+        self.path = os.path.join(self.directory, f"hot_search_snapshots.{ext}")
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _dumps(self, records: Dict[str, Dict[str, Any]]) -> bytes:
+        if msgpack is not None:
+            return msgpack.packb(records, use_bin_type=True)
+        return json.dumps(records, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def _loads(self, data: bytes) -> Dict[str, Dict[str, Any]]:
+        if msgpack is not None:
+            return msgpack.unpackb(data, raw=False)
+        return json.loads(data)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """读取落盘的快照记录，文件不存在或损坏时返回空字典"""
+        try:
+            with open(self.path, "rb") as f:
+                records = self._loads(f.read())
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"读取热搜快照文件失败 {self.path}: {e}")
+            return {}
+        with self._lock:
+            self._records.update(records)
+        return records
+
+    def save(self, category: str, record: Dict[str, Any]):
+        """更新一个分类的记录并原子地重写整个文件"""
+        with self._lock:
+            self._records[category] = record
+            data = self._dumps(self._records)
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".hot_search_snapshots-")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"写入热搜快照文件失败 {self.path}: {e}")
@@ -0,0 +1,289 @@
+"""
+热搜快照共享存储模块
+多个 worker / 节点通过同一个存储读取相同版本的快照，并用租约保证同一时间只有一个 worker 抓取上游
+支持三种后端：
+    memory: 进程内存（默认，单进程）
+    file:   本机共享目录，默认使用 /dev/shm（单机多 worker）
+    redis:  Redis 协议服务（多节点，需要安装 redis）
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+# (版本号, 最近一次确认内容为最新的时间)
+SnapshotMeta = Tuple[int, float]
+
+
+class SnapshotStore:
+    """快照存储接口，记录为可 JSON 序列化的字典，必须包含 version 和 checked_at"""
+
+    def peek_meta(self, category: str) -> Optional[SnapshotMeta]:
+        """读取分类快照的版本信息，不读取条目"""
+        raise NotImplementedError
+
+    def load(self, category: str) -> Optional[Dict[str, Any]]:
+        """读取分类快照记录"""
+        raise NotImplementedError
+
+    def save(self, category: str, record: Dict[str, Any]):
+        """保存分类快照记录"""
+        raise NotImplementedError
+
+    def touch(self, category: str, version: int, checked_at: float):
+        """内容未变化时只更新确认时间，存储中的版本已经不是 version 时不做任何修改"""
+        raise NotImplementedError
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """尝试获取租约，成功返回 True，租约到期自动失效"""
+        raise NotImplementedError
+
+    def release_lease(self, name: str, owner: str):
+        """释放自己持有的租约"""
+        raise NotImplementedError
+
+
+class MemoryStore(SnapshotStore):
+    """进程内存储，只在单个进程内共享"""
+
+    def __init__(self):
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def peek_meta(self, category: str) -> Optional[SnapshotMeta]:
+        record = self._records.get(category)
+        if record is None:
+            return None
+        return record["version"], record["checked_at"]
+
+    def load(self, category: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(category)
+        return dict(record) if record is not None else None
+
+    def save(self, category: str, record: Dict[str, Any]):
+        with self._lock:
+            self._records[category] = dict(record)
+
+    def touch(self, category: str, version: int, checked_at: float):
+        with self._lock:
+            record = self._records.get(category)
+            if record is not None and record["version"] == version:
+                record["checked_at"] = checked_at
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            holder = self._leases.get(name)
+            if holder is not None and holder[0] != owner and holder[1] > now:
+                return False
+            self._leases[name] = (owner, now + ttl)
+            return True
+
+    def release_lease(self, name: str, owner: str):
+        with self._lock:
+            holder = self._leases.get(name)
+            if holder is not None and holder[0] == owner:
+                del self._leases[name]
+
+
+class FileStore(SnapshotStore):
+    """
+    本机共享目录存储
+    每个分类一个快照文件和一个很小的版本文件，均通过临时文件 + os.replace 原子替换，读取方只会看到完整的文件；
+    租约文件内容为持有者，到期时间按文件修改时间加 ttl 判断；
+    租约的检查与替换、版本文件的比较与写入都在目录内的锁文件上加排他锁后进行
+    """
+
+    def __init__(self, directory: str = None):
+        if directory is None:
+            base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            directory = os.path.join(base, "hot_search_store")
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread_lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _locked(self):
+        """跨进程排他锁（同一进程内的线程先经过线程锁）"""
+        with self._thread_lock, open(self._path(".store.lock"), "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _write_atomic(self, path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _read_json(self, path: str) -> Optional[Any]:
+        try:
+            with open(path, "rb") as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            print(f"读取共享快照失败 {path}: {e}")
+            return None
+
+    def peek_meta(self, category: str) -> Optional[SnapshotMeta]:
+        meta = self._read_json(self._path(f"{category}.meta"))
+        if meta is None:
+            return None
+        return meta["version"], meta["checked_at"]
+
+    def load(self, category: str) -> Optional[Dict[str, Any]]:
+        return self._read_json(self._path(f"{category}.json"))
+
+    def _write_meta(self, category: str, version: int, checked_at: float):
+        meta = {"version": version, "checked_at": checked_at}
+        self._write_atomic(self._path(f"{category}.meta"), json.dumps(meta).encode("utf-8"))
+
+    def save(self, category: str, record: Dict[str, Any]):
+        # 先写快照再写版本文件，读到新版本号时快照文件一定已经是新的
+        self._write_atomic(self._path(f"{category}.json"), json.dumps(record, ensure_ascii=False).encode("utf-8"))
+        with self._locked():
+            self._write_meta(category, record["version"], record["checked_at"])
+
+    def touch(self, category: str, version: int, checked_at: float):
+        with self._locked():
+            current = self.peek_meta(category)
+            if current is not None and current[0] == version:
+                self._write_meta(category, version, checked_at)
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        path = self._path(f"{name}.lease")
+        with self._locked():
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                mtime = None
+            if mtime is not None and mtime + ttl > time.time():
+                holder = self._read_json(path)
+                if holder is None or holder.get("owner") != owner:
+                    return False
+            # 新建、续期或接管已过期的租约：完整写入临时文件后原子替换
+            self._write_atomic(path, json.dumps({"owner": owner}).encode("utf-8"))
+            return True
+
+    def release_lease(self, name: str, owner: str):
+        path = self._path(f"{name}.lease")
+        with self._locked():
+            holder = self._read_json(path)
+            if holder is not None and holder.get("owner") == owner:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+# 只删除自己持有的租约
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# 版本号未变时才更新确认时间
+_TOUCH_SCRIPT = """
+if redis.call('hget', KEYS[1], 'version') == ARGV[1] then
+    return redis.call('hset', KEYS[1], 'checked_at', ARGV[2])
+end
+return 0
+"""
+
+
+class RedisStore(SnapshotStore):
+    """Redis 协议存储，适用于多节点部署"""
+
+    def __init__(self, url: str = None, prefix: str = "hot_search"):
+        if redis is None:
+            raise RuntimeError("使用 Redis 存储需要安装 redis：pip install redis")
+        self.client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.prefix = prefix
+        self._release = self.client.register_script(_RELEASE_SCRIPT)
+        self._touch = self.client.register_script(_TOUCH_SCRIPT)
+
+    def _key(self, kind: str, name: str) -> str:
+        return f"{self.prefix}:{kind}:{name}"
+
+    def peek_meta(self, category: str) -> Optional[SnapshotMeta]:
+        meta = self.client.hmget(self._key("meta", category), "version", "checked_at")
+        if meta[0] is None:
+            return None
+        return int(meta[0]), float(meta[1])
+
+    def load(self, category: str) -> Optional[Dict[str, Any]]:
+        data = self.client.get(self._key("snapshot", category))
+        return json.loads(data) if data else None
+
+    def save(self, category: str, record: Dict[str, Any]):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(self._key("snapshot", category), json.dumps(record, ensure_ascii=False))
+        pipe.hset(self._key("meta", category), mapping={"version": record["version"], "checked_at": record["checked_at"]})
+        pipe.execute()
+
+    def touch(self, category: str, version: int, checked_at: float):
+        self._touch(keys=[self._key("meta", category)], args=[str(version), repr(float(checked_at))])
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        key = self._key("lease", name)
+        if self.client.set(key, owner, nx=True, px=int(ttl * 1000)):
+            return True
+        # 自己已持有时续期
+        current = self.client.get(key)
+        if current is not None and current.decode() == owner:
+            self.client.pexpire(key, int(ttl * 1000))
+            return True
+        return False
+
+    def release_lease(self, name: str, owner: str):
+        self._release(keys=[self._key("lease", name)], args=[owner])
+
+
+def create_store_from_env() -> SnapshotStore:
+    """
+    根据环境变量创建快照存储
+    HOT_SEARCH_STORE=memory|file|redis，file 的目录由 HOT_SEARCH_STORE_DIR 指定，redis 地址由 REDIS_URL 指定
+    """
+    backend = os.getenv("HOT_SEARCH_STORE", "memory").lower()
+    if backend == "file":
+        return FileStore(os.getenv("HOT_SEARCH_STORE_DIR") or None)
+    if backend == "redis":
+        return RedisStore(os.getenv("REDIS_URL"))
+    return MemoryStore()
@@ -0,0 +1,159 @@
+"""
+热搜推送模块（Server-Sent Events）
+后台刷新生成新快照后，由一个生产者把变化编码一次（持有相同版本的客户端共用同一帧），再分发给所有订阅的客户端；
+每个客户端记录已收到的各分类版本，有独立的有界队列，消费过慢的客户端会被断开；
+变化的计算和编码（首次渲染时还会做最高级别的预压缩）在线程池中执行，不阻塞事件循环
+"""
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from hot_search_cache import HotSearchCache, HotSearchSnapshot
+
+# 每个客户端最多积压的事件数，超过后断开该客户端
+SUBSCRIBER_QUEUE_SIZE = 16
+
+# 心跳间隔（秒），防止空闲连接被代理断开
+HEARTBEAT_INTERVAL = 15
+
+HEARTBEAT_FRAME = b": ping\n\n"
+
+
+def format_sse(data: bytes, event: str = None, event_id: Optional[int] = None) -> bytes:
+    """编码一条 SSE 事件，data 为单行 JSON"""
+    frame = b""
+    if event_id is not None:
+        frame += f"id: {event_id}\n".encode()
+    if event:
+        frame += f"event: {event}\n".encode()
+    return frame + b"data: " + data + b"\n\n"
+
+
+class _Subscriber:
+    """
+    一个推送连接
+    versions 为客户端已收到的各分类版本，收到初始快照前没有该分类的记录，分类暂无数据时为 None
+    """
+
+    def __init__(self, categories: List[str], queue_size: int):
+        self.categories = set(categories)
+        self.versions: Dict[str, Optional[int]] = {}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def offer(self, frame: bytes) -> bool:
+        """放入事件，队列已满时清空队列并放入结束标记，返回 False"""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+
+class HotSearchBroadcaster:
+    """热搜变化广播器"""
+
+    def __init__(
+        self,
+        cache: HotSearchCache,
+        queue_size: int = SUBSCRIBER_QUEUE_SIZE,
+        heartbeat: float = HEARTBEAT_INTERVAL
+    ):
+        self.cache = cache
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._subscribers: Set[_Subscriber] = set()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {"events": 0, "delivered": 0, "dropped": 0}
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """绑定分发所在的事件循环，在应用启动时调用"""
+        self._loop = loop
+
+    def publish(self, snapshot: HotSearchSnapshot):
+        """
+        快照监听函数，可在任意线程中调用
+        实际分发切换到绑定的事件循环中执行
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._subscribers:
+            return
+        asyncio.run_coroutine_threadsafe(self._broadcast(snapshot.category), loop)
+
+    async def _broadcast(self, category: str):
+        """
+        把最新快照相对各客户端已有版本的变化分发出去，每个不同的已有版本只计算并编码一次
+        已经持有最新版本或尚未收到初始快照的客户端跳过，不会收到重复的事件；
+        同一分类的广播依次执行，客户端收到的版本不会乱序
+        """
+        async with self._locks.setdefault(category, asyncio.Lock()):
+            snapshot = self.cache.peek(category)
+            if snapshot is None:
+                return
+            pending = []
+            for subscriber in list(self._subscribers):
+                if category not in subscriber.versions:
+                    continue
+                since = subscriber.versions[category]
+                if since is None or since < snapshot.version:
+                    pending.append((subscriber, since))
+
+            frames: Dict[Optional[int], bytes] = {}
+            for since in dict.fromkeys(since for _, since in pending):
+                base = self.cache.get_recent(category, since)
+                rendered = await asyncio.to_thread(snapshot.get_changes, since, base)
+                frames[since] = format_sse(rendered.body, event="changes", event_id=snapshot.version)
+                self._stats["events"] += 1
+
+            for subscriber, since in pending:
+                if subscriber in self._subscribers:
+                    self._deliver(subscriber, category, snapshot.version, frames[since])
+
+    def _deliver(self, subscriber: _Subscriber, category: str, version: int, frame: bytes):
+        """记录客户端的新版本并放入事件，队列已满的慢客户端被断开"""
+        subscriber.versions[category] = version
+        if subscriber.offer(frame):
+            self._stats["delivered"] += 1
+        else:
+            self._stats["dropped"] += 1
+            self._subscribers.discard(subscriber)
+
+    async def stream(self, categories: List[str]) -> AsyncIterator[bytes]:
+        """
+        订阅分类变化的 SSE 事件流
+        连接后先推送各分类的全量快照（snapshot 事件），之后推送变化（changes 事件），
+        changes 事件中的 since 与客户端持有的版本不一致时，客户端应重新拉取全量数据
+        """
+        if self._loop is None:
+            self.bind(asyncio.get_running_loop())
+        subscriber = _Subscriber(categories, self.queue_size)
+        self._subscribers.add(subscriber)
+        try:
+            for category in categories:
+                snapshot = await asyncio.to_thread(self.cache.get_snapshot, category)
+                subscriber.versions[category] = snapshot.version if snapshot is not None else None
+                # 读取快照期间可能已有更新的版本被广播（当时跳过了本客户端），补发一次
+                await self._broadcast(category)
+                if snapshot is not None:
+                    rendered = await asyncio.to_thread(snapshot.get_changes, None, None)
+                    yield format_sse(rendered.body, event="snapshot", event_id=snapshot.version)
+
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT_FRAME
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self._subscribers.discard(subscriber)
+
+    def get_stats(self) -> Dict[str, int]:
+        """推送统计：当前连接数、事件数、投递数及断开的慢客户端数"""
+        stats = dict(self._stats)
+        stats["subscribers"] = len(self._subscribers)
+        return stats
@@ -0,0 +1,314 @@
+"""
+图片代理与缩略图缓存模块
+热搜配图和公司 logo 通过 /api/img 代理，原图和缩略图缓存在本地磁盘，按总大小做 LRU 淘汰；
+缩略图在进程池中生成（需要 Pillow，未安装时直接返回原图），新快照生成时预取其中的图片
+"""
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from single_flight import SingleFlight
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# 磁盘缓存目录和总大小上限（字节）
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "image_cache")
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# 允许代理的图片域名（后缀匹配），防止被当作任意地址的开放代理
+# 热搜配图在 fyb-*.cdn.bcebos.com 上；前端 VITE_IMAGE_PROXY_HOSTS 需要保持一致，不在名单内的图片前端直接加载原图
+ALLOWED_HOSTS = tuple(
+    host.strip() for host in os.getenv(
+        "IMAGE_PROXY_HOSTS", "baidu.com,bdstatic.com,bdimg.com,bcebos.com,zhipin.com,bosszhipin.com"
+    ).split(",") if host.strip()
+)
+
+# 支持的缩略图宽度，请求的宽度向上取整到其中之一，限制缓存的版本数量
+THUMBNAIL_WIDTHS = (64, 128, 256, 512)
+
+# 新快照生成时预取的缩略图宽度（首页列表使用）
+PREFETCH_WIDTH = 128
+
+# 单张图片的最大字节数
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+
+# 代理图片的浏览器缓存时间（秒）
+IMAGE_MAX_AGE = 30 * 24 * 3600
+
+# 只代理 Pillow 能重新编码的位图；SVG 可以内嵌脚本，从 API 源返回相当于存储型 XSS，因此和 ICO 一样不代理
+MEDIA_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+EXTENSION_MEDIA = {ext: media for media, ext in MEDIA_EXTENSIONS.items()}
+
+
+def make_thumbnail(data: bytes, width: int, fmt: str) -> bytes:
+    """生成缩略图，在进程池中执行；原图比目标宽度小时只转换格式"""
+    with Image.open(io.BytesIO(data)) as img:
+        img.thumbnail((width, width * 4))
+        if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        out = io.BytesIO()
+        img.save(out, fmt, quality=80)
+        return out.getvalue()
+
+
+class DiskLRUCache:
+    """
+    磁盘 LRU 缓存，每个条目一个文件，文件名为缓存键加媒体类型扩展名
+    启动时按修改时间重建访问顺序，命中时更新修改时间
+    """
+
+    def __init__(self, directory: str = IMAGE_CACHE_DIR, max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        files = []
+        for name in os.listdir(self.directory):
+            key, _, ext = name.partition(".")
+            if ext not in EXTENSION_MEDIA:
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            files.append((stat.st_mtime, key, name, stat.st_size))
+        for _, key, name, size in sorted(files):
+            self._entries[key] = (name, size)
+            self._total += size
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """读取缓存，返回 (内容, 媒体类型)；其他进程写入的文件也能命中"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        names = [entry[0]] if entry else [f"{key}.{ext}" for ext in EXTENSION_MEDIA]
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            if entry is None:
+                with self._lock:
+                    if key not in self._entries:
+                        self._entries[key] = (name, len(data))
+                        self._total += len(data)
+            return data, EXTENSION_MEDIA[name.partition(".")[2]]
+        if entry is not None:
+            with self._lock:
+                if self._entries.pop(key, None) is not None:
+                    self._total -= entry[1]
+        return None
+
+    def put(self, key: str, data: bytes, media_type: str):
+        """写入缓存，超过总大小上限时淘汰最久未使用的条目"""
+        name = f"{key}.{MEDIA_EXTENSIONS[media_type]}"
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+
+        evicted = []
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total -= old[1]
+            self._entries[key] = (name, len(data))
+            self._total += len(data)
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                _, (old_name, size) = self._entries.popitem(last=False)
+                self._total -= size
+                evicted.append(old_name)
+        for old_name in evicted:
+            try:
+                os.remove(os.path.join(self.directory, old_name))
+            except FileNotFoundError:
+                pass
+
+    def get_stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total, "max_bytes": self.max_bytes}
+
+
+class ImageProxy:
+    """图片代理：异步抓取原图，缓存原图和缩略图"""
+
+    def __init__(self, cache: DiskLRUCache = None, max_concurrency: int = 8, timeout: float = 10):
+        self.cache = cache or DiskLRUCache()
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        }
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._flight = SingleFlight()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {"hits": 0, "misses": 0, "failed": 0, "prefetched": 0}
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """绑定预取任务所在的事件循环，在应用启动时调用"""
+        self._loop = loop
+
+    def is_allowed(self, url: str) -> bool:
+        """只代理白名单域名下的 http(s) 图片"""
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            return False
+        host = parsed.hostname.lower()
+        return any(host == allowed or host.endswith("." + allowed) for allowed in ALLOWED_HOSTS)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                follow_redirects=True,
+                event_hooks={"request": [self._check_request]}
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _check_request(self, request: httpx.Request):
+        """重定向后的地址同样必须在白名单内"""
+        if not self.is_allowed(str(request.url)):
+            raise httpx.RequestError(f"不允许代理的图片地址: {request.url}", request=request)
+
+    async def _download(self, url: str) -> Optional[Tuple[bytes, str]]:
+        client = self._get_client()
+        async with self._semaphore:
+            response = await client.get(url)
+        response.raise_for_status()
+        media_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        if media_type not in MEDIA_EXTENSIONS or len(response.content) > MAX_IMAGE_BYTES:
+            print(f"不支持的图片 {url}: {media_type}, {len(response.content)} 字节")
+            return None
+        return response.content, media_type
+
+    async def _get_original(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """原图，同一地址的并发请求（包括不同尺寸的缩略图）只下载一次"""
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return await self._flight.do_async(key, self._load_original, key, url)
+
+    async def _load_original(self, key: str, url: str) -> Optional[Tuple[bytes, str]]:
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            self._stats["hits"] += 1
+            return cached
+        self._stats["misses"] += 1
+        try:
+            result = await self._download(url)
+        except Exception as e:
+            print(f"获取图片失败 {url}: {e}")
+            result = None
+        if result is None:
+            self._stats["failed"] += 1
+            return None
+        await asyncio.to_thread(self.cache.put, key, *result)
+        return result
+
+    async def _make_thumbnail(self, data: bytes, width: int, fmt: str) -> Optional[bytes]:
+        if self._pool is None:
+            # 用 spawn 启动工作进程：fork 会复制事件循环、HTTP 连接和调度线程持有的锁
+            self._pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, make_thumbnail, data, width, fmt)
+        except Exception as e:
+            print(f"生成缩略图失败: {e}")
+            return None
+
+    async def _build_thumbnail(self, key: str, url: str, width: int, fmt: str) -> Optional[Tuple[bytes, str]]:
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            self._stats["hits"] += 1
+            return cached
+        self._stats["misses"] += 1
+        original = await self._get_original(url)
+        if original is None or original[1] == "image/gif":
+            return original
+        thumbnail = await self._make_thumbnail(original[0], width, fmt)
+        if thumbnail is None:
+            return original
+        media_type = "image/webp" if fmt == "WEBP" else "image/jpeg"
+        await asyncio.to_thread(self.cache.put, key, thumbnail, media_type)
+        return thumbnail, media_type
+
+    async def get_image(self, url: str, width: Optional[int] = None, accept: str = "") -> Optional[Tuple[bytes, str, str]]:
+        """
+        获取代理图片
+
+        Args:
+            url: 原图地址
+            width: 缩略图宽度，向上取整到 THUMBNAIL_WIDTHS；为 None 或未安装 Pillow 时返回原图
+            accept: 请求头 Accept，支持 image/webp 时生成 WebP 缩略图，否则生成 JPEG
+
+        Returns:
+            (内容, 媒体类型, ETag)，获取失败时返回 None
+        """
+        if width is None or Image is None:
+            result = await self._get_original(url)
+        else:
+            width = next((w for w in THUMBNAIL_WIDTHS if w >= width), THUMBNAIL_WIDTHS[-1])
+            fmt = "WEBP" if "image/webp" in accept else "JPEG"
+            key = hashlib.sha1(f"{url}|{width}|{fmt}".encode("utf-8")).hexdigest()
+            result = await self._flight.do_async(key, self._build_thumbnail, key, url, width, fmt)
+        if result is None:
+            return None
+        data, media_type = result
+        return data, media_type, '"' + hashlib.sha1(data).hexdigest() + '"'
+
+    async def prefetch(self, urls: Iterable[str]):
+        """预取图片及列表缩略图，失败的忽略"""
+        for url in dict.fromkeys(urls):
+            if not url or not self.is_allowed(url):
+                continue
+            result = await self.get_image(url, PREFETCH_WIDTH, "image/webp")
+            if result is not None:
+                self._stats["prefetched"] += 1
+
+    def prefetch_snapshot(self, snapshot):
+        """快照监听函数，可在任意线程中调用，预取切换到绑定的事件循环中执行"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        urls = [item.get("img", "") for item in snapshot.items]
+        asyncio.run_coroutine_threadsafe(self.prefetch(urls), loop)
+
+    def get_stats(self):
+        stats = dict(self._stats)
+        stats["cache"] = self.cache.get_stats()
+        return stats
+
+    async def close(self):
+        """关闭 HTTP 客户端和缩略图进程池"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,16 @@
+"""
+热搜条目 ID 模块
+条目 ID 由标题生成，缓存、历史记录和浏览器爬虫的去重都使用同一个 ID，
+该模块不依赖其他模块，爬虫和历史记录可以单独导入而不加载快照缓存
+"""
+import hashlib
+import unicodedata
+
+
+def make_item_id(title: str) -> str:
+    """
+    根据标题生成稳定的条目 ID，排名变化或跨分类时同一话题的 ID 不变
+    标题先做 NFKC 归一化、合并空白并转小写，避免全角半角或空格差异产生不同 ID
+    """
+    normalized = " ".join(unicodedata.normalize("NFKC", title or "").split()).lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
@@ -2,6 +2,7 @@
 Boss直聘招聘数据采集模块
 用于获取外企招聘信息，并存储到数据库
 """
+import os
 import requests
 import json
 import random
@@ -14,6 +15,10 @@ from pydantic import BaseModel
 from db_config import get_connection_params
 
 
+# Boss直聘站点地址，可指向本地替身服务器（upstream_standin.py）以离线回放
+ZHIPIN_BASE_URL = os.getenv("ZHIPIN_BASE_URL", "https://www.zhipin.com").rstrip("/")
+
+
 class JobBase(BaseModel):
     """招聘职位基础信息"""
     job_id: str
@@ -332,8 +337,8 @@ class BossZhipinSpider:
     """Boss直聘爬虫"""
     
     def __init__(self, cookie: str = None):
-        self.base_url = "https://www.zhipin.com/wapi/zpgeek/search/joblist.json"
-        self.detail_url = "https://www.zhipin.com/wapi/zpgeek/job/detail.json"
+        self.base_url = f"{ZHIPIN_BASE_URL}/wapi/zpgeek/search/joblist.json"
+        self.detail_url = f"{ZHIPIN_BASE_URL}/wapi/zpgeek/job/detail.json"
         self.session = requests.Session()
         
         self.headers = {
@@ -0,0 +1,39 @@
+"""
+快速 JSON 响应模块
+安装了 orjson 时用 orjson 序列化，datetime / date / UUID 原生支持，Decimal 转为数字；
+未安装时退回 FastAPI 默认的 jsonable_encoder + 标准库 json
+"""
+from decimal import Decimal
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """orjson 不能直接序列化的类型"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    应用默认的 JSON 响应类
+    接口直接返回 FastJSONResponse(数据) 时跳过 jsonable_encoder 和 response_model 校验，
+    只用于数据来源可信（数据库、爬虫快照）的高频接口
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
@@ -1,12 +1,15 @@
 from fastapi import FastAPI, Depends, HTTPException, status, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.responses import RedirectResponse, HTMLResponse
+from fastapi.responses import RedirectResponse, HTMLResponse, Response, StreamingResponse
+import asyncio
 import psycopg2
 import requests
 from urllib.parse import urlencode
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 from auth import (
     verify_password, get_password_hash, create_access_token, decode_token,
     Token, TokenData, User, UserCreate, UserLogin
@@ -14,33 +17,88 @@ from auth import (
 from pydantic import BaseModel
 from gitee_config import (
     GITEE_CLIENT_ID, GITEE_CLIENT_SECRET, GITEE_REDIRECT_URI,
-    GITEE_AUTH_URL, GITEE_TOKEN_URL, GITEE_USER_API
+    GITEE_AUTH_URL, GITEE_TOKEN_URL, GITEE_USER_API, GITEE_EMAILS_API
 )
 from db_config import get_connection_params, is_production
 import os
 
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
-from baidu_hot_spider import get_baidu_hot_search as get_baidu_hot_search_live
+from baidu_hot_spider import get_baidu_hot_search_if_changed, get_baidu_hot_search_if_changed_async
+from hot_search_cache import HotSearchCache, format_hot_search_item
+from compression import CompressionMiddleware, etag_matches, negotiated_response
+from image_proxy import ImageProxy, IMAGE_MAX_AGE
+from json_response import FastJSONResponse
+from hot_search_history import HotSearchHistory
+from hot_search_persist import SnapshotPersistence
+from hot_search_store import create_store_from_env
+from hot_search_stream import HotSearchBroadcaster
+from scheduler import create_default_scheduler
 
-_cached_hot_search = []
-_cached_time = 0
-CACHE_DURATION = 300
+# 各分类热搜快照缓存，由应用生命周期内的后台任务定时刷新
+# 多 worker 部署时通过 HOT_SEARCH_STORE 共享快照，只有一个 worker 抓取上游
+hot_search_cache = HotSearchCache(
+    get_baidu_hot_search_if_changed,
+    async_fetcher=get_baidu_hot_search_if_changed_async,
+    store=create_store_from_env()
+)
 
-def get_cached_hot_search():
-    """获取缓存的实时热搜数据"""
-    global _cached_hot_search, _cached_time
-    import time
-    current_time = time.time()
-    
-    if not _cached_hot_search or (current_time - _cached_time) > CACHE_DURATION:
-        try:
-            _cached_hot_search = get_baidu_hot_search_live("realtime")
-            _cached_time = current_time
-            print(f"刷新百度热搜缓存，共 {_cached_hot_search} 条数据")
-        except Exception as e:
-            print(f"获取百度热搜失败: {e}")
-    
-    return _cached_hot_search
+# 热搜快照历史，新快照在单独的线程中追加写入
+hot_search_history = HotSearchHistory()
+_history_executor = ThreadPoolExecutor(max_workers=1)
+
+def record_hot_search_snapshot(snapshot):
+    """把新生成的热搜快照追加到历史表"""
+    items = [
+        format_hot_search_item(item, idx, snapshot.category, snapshot.created_at)
+        for idx, item in enumerate(snapshot.items, start=1)
+    ]
+    _history_executor.submit(
+        hot_search_history.save_snapshot,
+        snapshot.category,
+        items,
+        datetime.fromtimestamp(snapshot.fetched_at)
+    )
+
+if os.getenv("HOT_SEARCH_HISTORY_ENABLED", "true").lower() == "true":
+    hot_search_cache.add_listener(record_hot_search_snapshot, local_only=True)
+
+# 冷启动预热：导入时载入上次落盘的快照，第一个请求无需等待抓取，过期快照在后台刷新
+hot_search_persistence = SnapshotPersistence()
+_persist_executor = ThreadPoolExecutor(max_workers=1)
+
+def persist_hot_search_snapshot(snapshot):
+    """把新快照写入本地快照文件"""
+    _persist_executor.submit(hot_search_persistence.save, snapshot.category, snapshot.to_record())
+
+if os.getenv("HOT_SEARCH_WARM_START", "true").lower() == "true":
+    hot_search_cache.warm_start(hot_search_persistence.load())
+    hot_search_cache.add_listener(persist_hot_search_snapshot)
+
+# 热搜变化推送，新快照生成后广播给所有 SSE 连接
+hot_search_broadcaster = HotSearchBroadcaster(hot_search_cache)
+hot_search_cache.add_listener(hot_search_broadcaster.publish)
+
+# 图片代理，新快照生成后预取其中的配图
+image_proxy = ImageProxy()
+hot_search_cache.add_listener(image_proxy.prefetch_snapshot, local_only=True)
+
+# 抓取任务调度器，嵌入运行时替代外部定时器调用 update_hot_search.bat；
+# 也可以单独运行 python scheduler.py，两者通过共享存储的租约避免重复抓取
+scheduler = create_default_scheduler(hot_search_cache.store) if os.getenv("SCHEDULER_EMBEDDED", "false").lower() == "true" else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时开启热搜后台刷新和抓取任务调度，关闭时停止"""
+    hot_search_broadcaster.bind(asyncio.get_running_loop())
+    image_proxy.bind(asyncio.get_running_loop())
+    hot_search_cache.start()
+    if scheduler is not None:
+        scheduler.start()
+    yield
+    if scheduler is not None:
+        await scheduler.stop()
+    await hot_search_cache.stop()
+    await image_proxy.close()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
@@ -48,9 +106,14 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 app = FastAPI(
     title="百度热搜API",
     description="提供百度热搜榜数据的API接口",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+# 压缩超过阈值的动态响应，预压缩的快照响应原样通过
+app.add_middleware(CompressionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -279,7 +342,13 @@ def read_root():
         "message": "百度热搜API",
         "endpoints": {
             "hot_search": "/api/hot-search",
+            "hot_search_history": "/api/hot-search?at={timestamp}",
+            "hot_search_changes": "/api/hot-search/changes?category={category}&since={version}",
+            "hot_search_stream": "/api/hot-search/stream?categories={categories}",
+            "hot_search_batch": "/api/hot-search/batch?categories={categories}&page_size={page_size}",
+            "hot_search_item": "/api/hot-search/item/{id}",
             "hot_search_by_rank": "/api/hot-search/{rank}",
+            "image_proxy": "/api/img?url={url}&w={width}",
             "auth": {
                 "register": "/api/auth/register",
                 "login": "/api/auth/login",
@@ -408,7 +477,7 @@ async def gitee_callback(code: str = Query(...)):
             print(f"[DEBUG] ============================================")
         
         if not email:
-            emails_response = requests.get("https://gitee.com/api/v5/user/emails", params={
+            emails_response = requests.get(GITEE_EMAILS_API, params={
                 "access_token": access_token
             })
             if emails_response.status_code == 200:
@@ -484,7 +553,7 @@ def get_jobs(
             page=page,
             page_size=page_size
         )
-        return result
+        return FastJSONResponse(result)
     except Exception as e:
         print(f"获取招聘信息错误: {e}")
         return {"error": "获取招聘信息失败", "data": [], "total": 0}
@@ -503,7 +572,7 @@ def get_job_detail(job_id: int):
         job = db.get_job_by_id(job_id)
         if not job:
             raise HTTPException(status_code=404, detail="职位不存在")
-        return {"data": job}
+        return FastJSONResponse({"data": job})
     except HTTPException:
         raise
     except Exception as e:
@@ -534,7 +603,7 @@ def get_foreign_jobs(
             page=page,
             page_size=page_size
         )
-        return result
+        return FastJSONResponse(result)
     except Exception as e:
         print(f"获取招聘信息错误: {e}")
         return {"error": "获取招聘信息失败", "data": [], "total": 0}
@@ -611,104 +680,180 @@ def get_job_cities():
         ]
     }
 
+def hot_search_headers(snapshot) -> Dict[str, str]:
+    """
+    热搜响应头：快照年龄（Age），ETag 由 negotiated_response 按所选编码设置
+    快照已过期或上游不可用（熔断中）时加上 Warning: 110，表示返回的是旧数据
+    """
+    headers = {"Cache-Control": "no-cache"}
+    if snapshot is not None:
+        headers["Age"] = str(int(snapshot.age()))
+        if hot_search_cache.is_stale(snapshot) or hot_search_cache.is_degraded(snapshot.category):
+            headers["Warning"] = '110 - "Response is Stale"'
+    return headers
+
 # 获取所有热搜数据（支持分页和分类）
 @app.get("/api/hot-search")
 def get_hot_search(
+    request: Request,
     page: int = Query(1),
     page_size: int = Query(20),
-    category: str = Query(None)
+    category: str = Query(None),
+    at: Optional[datetime] = Query(None)
 ):
     """
     获取百度热搜数据（支持分页和分类）
+    响应带有 ETag，请求头 If-None-Match 命中时返回 304
     
     Args:
         page: 页码，默认为1
         page_size: 每页数量，默认为20
         category: 分类，可选值：realtime(实时), movie(电影), sport(体育), tech(科技), entertainment(娱乐)
+        at: 可选的历史时刻（ISO 8601），返回该时刻的榜单
     """
     try:
         cat = category or "realtime"
-        live_data = get_baidu_hot_search_live(cat)
-        
-        if live_data and len(live_data) > 0:
-            total = len(live_data)
+        if at is not None:
+            history = hot_search_history.get_board_at(cat, at)
+            total = len(history)
             offset = (page - 1) * page_size
-            page_data = live_data[offset:offset + page_size]
-            
-            formatted_data = []
-            for idx, item in enumerate(page_data, start=offset + 1):
-                formatted_data.append({
-                    "id": item.get("index", idx),
-                    "rank": item.get("index", idx),
-                    "title": item.get("word", ""),
-                    "url": item.get("url", ""),
-                    "image_url": item.get("img", ""),
-                    "hot_index": item.get("hot_score", ""),
-                    "category": category or "realtime",
-                    "created_at": datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
-                })
-            
-            return {
-                "data": formatted_data,
+            return FastJSONResponse({
+                "data": history[offset:offset + page_size] if offset >= 0 else [],
                 "total": total,
                 "page": page,
                 "page_size": page_size,
                 "total_pages": (total + page_size - 1) // page_size
-            }
+            })
+        
+        snapshot = hot_search_cache.get_snapshot(cat)
+        
+        if snapshot and len(snapshot.items) > 0:
+            rendered = snapshot.get_page(page, page_size)
+            return negotiated_response(request, rendered, hot_search_headers(snapshot))
     except Exception as e:
         print(f"获取百度热搜数据失败: {e}")
     
     return {"data": [], "total": 0, "page": page, "page_size": page_size, "total_pages": 0}
 
+# 一次获取多个分类的第一页（首屏加载）
+@app.get("/api/hot-search/batch")
+def get_hot_search_batch(
+    request: Request,
+    categories: str = Query("realtime,movie,sport,tech,entertainment"),
+    page_size: int = Query(20)
+):
+    """
+    一次返回多个分类的第一页热搜，首屏只需一次请求
+    响应为 {"分类": 与 /api/hot-search 相同格式的分页数据}，由各分类预渲染的分页直接拼接
+
+    Args:
+        categories: 逗号分隔的分类列表
+        page_size: 每个分类返回的数量
+    """
+    cats = [cat.strip() for cat in categories.split(",") if cat.strip()]
+    rendered = hot_search_cache.get_batch(list(dict.fromkeys(cats)), page_size)
+    return negotiated_response(request, rendered, {"Cache-Control": "no-cache"})
+
+# 获取热搜增量变化
+@app.get("/api/hot-search/changes")
+def get_hot_search_changes(
+    request: Request,
+    category: str = Query(None),
+    since: Optional[int] = Query(None)
+):
+    """
+    获取热搜自客户端版本以来的变化（新增、移除、排名或热度变化的条目）
+    客户端版本过旧或未提供时返回全量数据（full 为 true）
+    
+    Args:
+        category: 分类，默认为 realtime
+        since: 客户端持有的版本号，即上次响应中的 version
+    """
+    cat = category or "realtime"
+    rendered = hot_search_cache.get_changes(cat, since)
+    if rendered is None:
+        return {"category": cat, "version": None, "since": None, "full": True, "data": [], "total": 0}
+    return negotiated_response(request, rendered, hot_search_headers(hot_search_cache.peek(cat)))
+
+# 热搜变化推送（Server-Sent Events）
+@app.get("/api/hot-search/stream")
+def stream_hot_search(categories: str = Query("realtime")):
+    """
+    订阅热搜变化推送
+    连接后先收到各分类的全量快照（snapshot 事件），之后每次刷新有变化时收到变化（changes 事件），
+    空闲时定期发送心跳注释
+    
+    Args:
+        categories: 逗号分隔的分类列表，默认为 realtime
+    """
+    cats = [cat.strip() for cat in categories.split(",") if cat.strip() in hot_search_cache.categories] or ["realtime"]
+    return StreamingResponse(
+        hot_search_broadcaster.stream(cats),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# 根据稳定的条目 ID 获取热搜数据
+@app.get("/api/hot-search/item/{item_id}", response_model=Dict[str, Any])
+def get_hot_search_item(item_id: str):
+    """
+    根据条目 ID（标准化标题的哈希）获取热搜数据，排名变化后 ID 不变
+    先在各分类的当前快照中查找，已跌出榜单的话题从历史表中查找最近一次记录
+    """
+    item = hot_search_cache.find_item(item_id)
+    if item is not None:
+        return FastJSONResponse(item)
+
+    item = hot_search_history.get_item(item_id)
+    if item is not None:
+        return FastJSONResponse(item)
+
+    return {"error": f"未找到 ID 为 {item_id} 的热搜数据"}
+
 # 根据排名获取热搜数据
 @app.get("/api/hot-search/{rank}", response_model=Dict[str, Any])
 def get_hot_search_by_rank(rank: int):
     """
     根据排名获取百度热搜数据
     """
-    hot_list = get_cached_hot_search()
+    snapshot = hot_search_cache.get_snapshot("realtime")
+    hot_list = snapshot.items if snapshot else []
     
     if rank >= 1 and rank <= len(hot_list):
-        item = hot_list[rank - 1]
-        return {
-            "id": item.get("index", rank),
-            "rank": item.get("index", rank),
-            "title": item.get("word", ""),
-            "url": item.get("url", ""),
-            "image_url": item.get("img", ""),
-            "hot_index": item.get("hot_score", ""),
-            "category": "realtime",
-            "created_at": datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
-        }
+        return FastJSONResponse(format_hot_search_item(hot_list[rank - 1], rank, "realtime", snapshot.created_at))
     
-    conn = get_db_connection()
-    if conn:
-        try:
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT id, rank_num, title, url, created_at, image_url, hot_index, category FROM baidu_hot_search WHERE rank_num = %s ORDER BY created_at DESC LIMIT 1",
-                (rank,)
-            )
-            row = cur.fetchone()
-            cur.close()
-            conn.close()
-            
-            if row:
-                return {
-                    "id": row[0],
-                    "rank": row[1],
-                    "title": row[2],
-                    "url": row[3],
-                    "image_url": row[5] or "",
-                    "hot_index": row[6] or "",
-                    "category": row[7] or "realtime",
-                    "created_at": row[4].isoformat() if hasattr(row[4], 'isoformat') else str(row[4])
-                }
-        except Exception as e:
-            print(f"数据库查询错误: {e}")
+    # 缓存中没有时读取数据库中的当前榜单
+    board = hot_search_history.get_latest_board("realtime")
+    if 1 <= rank <= len(board):
+        return FastJSONResponse(board[rank - 1])
     
     return {"error": f"未找到排名为 {rank} 的热搜数据"}
 
+# 图片代理
+@app.get("/api/img")
+async def proxy_image(request: Request, url: str = Query(...), w: Optional[int] = Query(None)):
+    """
+    代理热搜配图和公司 logo，原图和缩略图缓存在本地磁盘
+
+    Args:
+        url: 原图地址，只支持白名单域名
+        w: 可选的缩略图宽度，浏览器支持时返回 WebP
+    """
+    if not image_proxy.is_allowed(url):
+        raise HTTPException(status_code=400, detail="不支持的图片地址")
+    result = await image_proxy.get_image(url, w, request.headers.get("accept", ""))
+    if result is None:
+        raise HTTPException(status_code=502, detail="获取图片失败")
+    body, media_type, etag = result
+    headers = {
+        "Cache-Control": f"public, max-age={IMAGE_MAX_AGE}, immutable", "ETag": etag, "Vary": "Accept",
+        # 代理的是第三方内容，禁止浏览器嗅探类型，并且即使被直接打开也不能执行脚本
+        "X-Content-Type-Options": "nosniff", "Content-Security-Policy": "sandbox"
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
 # 健康检查
 @app.get("/health")
 def health_check():
@@ -716,11 +861,14 @@ def health_check():
     健康检查
     """
     conn = get_db_connection()
+    result = {"hot_search": hot_search_cache.get_stats()}
+    if scheduler is not None:
+        result["scheduler"] = scheduler.get_stats()
     if conn:
         conn.close()
-        return {"status": "healthy", "database": "connected"}
+        return FastJSONResponse({"status": "healthy", "database": "connected", **result})
     else:
-        return {"status": "unhealthy", "database": "disconnected"}
+        return FastJSONResponse({"status": "unhealthy", "database": "disconnected", **result})
 
 if __name__ == "__main__":
     import uvicorn
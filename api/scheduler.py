@@ -0,0 +1,301 @@
+"""
+后台抓取任务调度模块
+取代外部定时器调用 update_hot_search.bat 的方式：在常驻进程的事件循环中按各数据源的间隔运行抓取任务，
+间隔带随机抖动；同一任务不会重叠运行（跨进程通过共享存储的租约互斥），失败后按指数退避重试；
+每个任务的最近运行情况记录在本地账本文件中，重启后按账本中的下次运行时间继续，而不是立即全部重跑
+可以嵌入 FastAPI 生命周期运行（SCHEDULER_EMBEDDED=true），也可以单独运行：python scheduler.py
+"""
+import asyncio
+import inspect
+import json
+import os
+import random
+import signal
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from hot_search_store import MemoryStore, SnapshotStore, create_store_from_env
+
+
+# 运行账本文件
+SCHEDULER_LEDGER_PATH = os.getenv("SCHEDULER_LEDGER_PATH") or os.path.join(tempfile.gettempdir(), "scheduler_ledger.json")
+
+# 各数据源的抓取间隔（秒），为 0 时不调度该数据源
+HOT_SEARCH_CRAWL_INTERVAL = int(os.getenv("HOT_SEARCH_CRAWL_INTERVAL", "1800"))
+JOBS_CRAWL_INTERVAL = int(os.getenv("JOBS_CRAWL_INTERVAL", "21600"))
+
+# 间隔的随机抖动比例，避免多个任务或多个部署在同一时刻抓取上游
+DEFAULT_JITTER = 0.1
+
+# 失败后第一次重试的等待时间和退避上限（秒）
+RETRY_DELAY = 60
+MAX_BACKOFF = 3600
+
+# 单次运行的超时时间（秒），超时后不再等待，但在运行结束前不会开始下一次
+JOB_TIMEOUT = 900
+
+
+@dataclass
+class ScheduledJob:
+    """
+    定时任务
+
+    Attributes:
+        func: 同步函数（在线程中运行）或协程函数
+        interval: 成功后的运行间隔（秒）
+        jitter: 间隔的随机抖动比例
+        timeout: 单次运行的超时时间（秒）
+    """
+    name: str
+    func: Callable[[], Any]
+    interval: float
+    jitter: float = DEFAULT_JITTER
+    timeout: float = JOB_TIMEOUT
+    retry_delay: float = RETRY_DELAY
+    max_backoff: float = MAX_BACKOFF
+
+    def next_delay(self, failures: int) -> float:
+        """下次运行前的等待时间：成功后为运行间隔，连续失败时从 retry_delay 开始指数退避"""
+        if failures > 0:
+            delay = min(self.retry_delay * 2 ** (failures - 1), self.max_backoff)
+        else:
+            delay = self.interval
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+
+class JobLedger:
+    """各任务最近运行情况的账本，每次更新后原子地重写整个 JSON 文件"""
+
+    def __init__(self, path: str = SCHEDULER_LEDGER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "rb") as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"读取调度账本失败 {self.path}: {e}")
+            return {}
+
+    def get(self, name: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._entries.get(name, {}))
+
+    def update(self, name: str, **fields):
+        """更新任务记录并写回文件，写入失败只打印日志"""
+        with self._lock:
+            self._entries.setdefault(name, {}).update(fields)
+            data = json.dumps(self._entries, ensure_ascii=False, indent=2).encode("utf-8")
+            directory = os.path.dirname(self.path) or "."
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"写入调度账本失败 {self.path}: {e}")
+
+    def get_all(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._entries.items()}
+
+
+class Scheduler:
+    """
+    asyncio 任务调度器，每个任务一个循环
+    运行前获取共享存储中的租约（默认只在进程内互斥，配置 HOT_SEARCH_STORE 后跨进程互斥），
+    未拿到租约或上一次运行尚未结束时跳过本次
+    """
+
+    def __init__(self, store: SnapshotStore = None, ledger: JobLedger = None):
+        self.store = store or MemoryStore()
+        self.ledger = ledger or JobLedger()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable[[], Any], interval: float, **kwargs) -> Optional[ScheduledJob]:
+        """注册任务，interval 不大于 0 时不调度"""
+        if interval <= 0:
+            print(f"任务 {name} 的间隔为 {interval}，不调度")
+            return None
+        job = ScheduledJob(name, func, interval, **kwargs)
+        self.jobs[name] = job
+        return job
+
+    def _initial_delay(self, job: ScheduledJob) -> float:
+        """按账本中的下次运行时间继续；没有记录时在一个抖动窗口内尽快运行"""
+        next_run = self.ledger.get(job.name).get("next_run")
+        if next_run is not None:
+            return max(0.0, next_run - time.time())
+        return random.uniform(0, job.interval * job.jitter)
+
+    def _lease_name(self, job: ScheduledJob) -> str:
+        return f"job_{job.name}"
+
+    def _release_when_done(self, job: ScheduledJob, future: asyncio.Future):
+        """运行真正结束（包括超时后仍在线程中运行的）时才释放租约"""
+        def release(_):
+            self._inflight.pop(job.name, None)
+            asyncio.ensure_future(asyncio.to_thread(self.store.release_lease, self._lease_name(job), self.owner))
+        future.add_done_callback(release)
+
+    async def run_once(self, job: ScheduledJob) -> Optional[bool]:
+        """
+        运行一次任务
+
+        Returns:
+            成功为 True，失败为 False，因重叠而跳过为 None
+        """
+        previous = self._inflight.get(job.name)
+        if previous is not None and not previous.done():
+            print(f"任务 {job.name} 上一次运行尚未结束，跳过本次")
+            self.ledger.update(job.name, last_status="skipped")
+            return None
+        # 租约时间取超时时间的两倍，持有进程崩溃后租约自动过期
+        if not await asyncio.to_thread(self.store.acquire_lease, self._lease_name(job), self.owner, job.timeout * 2):
+            print(f"任务 {job.name} 正在其他进程中运行，跳过本次")
+            self.ledger.update(job.name, last_status="skipped")
+            return None
+
+        if inspect.iscoroutinefunction(job.func):
+            future = asyncio.ensure_future(job.func())
+        else:
+            future = asyncio.ensure_future(asyncio.to_thread(job.func))
+        self._inflight[job.name] = future
+        self._release_when_done(job, future)
+
+        entry = self.ledger.get(job.name)
+        start = time.time()
+        self.ledger.update(job.name, last_started=start)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), job.timeout)
+        except asyncio.TimeoutError:
+            error = f"运行超过 {job.timeout} 秒"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        else:
+            error = None
+
+        duration = round(time.time() - start, 2)
+        if error is None:
+            self.ledger.update(
+                job.name, last_status="ok", last_success=time.time(), last_duration=duration,
+                failures=0, runs=entry.get("runs", 0) + 1
+            )
+            print(f"任务 {job.name} 运行完成，耗时 {duration} 秒")
+            return True
+        failures = entry.get("failures", 0) + 1
+        self.ledger.update(
+            job.name, last_status="failed", last_error=error, last_duration=duration,
+            failures=failures, runs=entry.get("runs", 0) + 1
+        )
+        print(f"任务 {job.name} 运行失败（连续第 {failures} 次）: {error}")
+        return False
+
+    async def _job_loop(self, job: ScheduledJob):
+        delay = self._initial_delay(job)
+        print(f"任务 {job.name} 将在 {delay:.0f} 秒后运行，间隔 {job.interval} 秒")
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.run_once(job)
+            except Exception as e:
+                print(f"调度任务 {job.name} 时出错: {e}")
+            delay = job.next_delay(self.ledger.get(job.name).get("failures", 0))
+            self.ledger.update(job.name, next_run=time.time() + delay)
+
+    def start(self):
+        """在当前事件循环中启动所有任务的调度循环"""
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._job_loop(job)) for job in self.jobs.values()]
+
+    async def stop(self):
+        """停止调度循环，正在线程中运行的任务会继续运行到结束"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        ledger = self.ledger.get_all()
+        return {
+            name: dict(
+                ledger.get(name, {}),
+                interval=job.interval,
+                running=name in self._inflight and not self._inflight[name].done()
+            )
+            for name, job in self.jobs.items()
+        }
+
+
+def crawl_hot_search_job():
+    """
+    抓取各分类热搜榜并写入快照历史
+    crawl_hot_search.main 会用备选数据补齐，自身不会失败；没有任何分类由 HTTP 或浏览器抓取成功时视为失败，触发退避
+    """
+    from crawl_hot_search import main
+    from crawl_pipeline import TIER_BROWSER, TIER_HTTP
+    tiers = main()
+    if not any(tier in (TIER_HTTP, TIER_BROWSER) for tier in tiers.values()):
+        raise RuntimeError(f"没有分类抓取成功: {tiers}")
+
+
+def crawl_jobs_job():
+    """抓取外企招聘数据并写入数据库，一条都没抓到时视为失败"""
+    from jobs_spider import crawl_and_save_jobs
+    result = crawl_and_save_jobs()
+    print(f"招聘数据抓取完成: {result}")
+    if result["crawled"] == 0:
+        raise RuntimeError(f"没有抓取到招聘数据: {result}")
+
+
+def create_default_scheduler(store: SnapshotStore = None) -> Scheduler:
+    """按环境变量中的间隔注册热搜和招聘抓取任务"""
+    scheduler = Scheduler(store=store or create_store_from_env())
+    scheduler.add_job("hot_search", crawl_hot_search_job, HOT_SEARCH_CRAWL_INTERVAL)
+    scheduler.add_job("jobs", crawl_jobs_job, JOBS_CRAWL_INTERVAL)
+    return scheduler
+
+
+async def _run_standalone():
+    scheduler = create_default_scheduler()
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows 不支持 add_signal_handler，Ctrl+C 时由 asyncio.run 取消
+            pass
+    scheduler.start()
+    print(f"调度器已启动，账本: {scheduler.ledger.path}")
+    try:
+        await stop_event.wait()
+    finally:
+        await scheduler.stop()
+        print("调度器已停止")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_run_standalone())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,98 @@
+"""
+请求合并模块（single-flight）
+同一个 key 同时只执行一次上游调用，其余调用方等待并共享该次结果，
+同时支持多线程（同步接口）和 asyncio（异步接口）调用
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Set, Tuple
+
+
+class SingleFlight:
+    """按 key 合并并发调用"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._tasks: Set[asyncio.Future] = set()
+        self._stats = {
+            "calls": 0,        # 总调用次数
+            "executions": 0,   # 实际执行上游调用的次数
+            "coalesced": 0,    # 被合并、等待他人结果的调用次数
+        }
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """加入 key 对应的调用，返回 (future, 是否为执行者)"""
+        with self._lock:
+            self._stats["calls"] += 1
+            future = self._calls.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self._stats["executions"] += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: BaseException = None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable, *args) -> Any:
+        """同步调用：同一 key 只有第一个调用方执行 fn，其余线程阻塞等待其结果"""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key: str, fn: Callable, *args) -> Any:
+        """
+        异步调用：其余协程等待执行者的结果
+        fn 为协程函数时作为独立任务运行，为普通阻塞函数时放到线程池运行；
+        所有调用方（包括执行者）都通过 shield 等待共享结果，任何一个调用方被取消都不影响其他调用方和上游调用本身
+        """
+        future, leader = self._join(key)
+        if leader:
+            if asyncio.iscoroutinefunction(fn):
+                task = asyncio.ensure_future(fn(*args))
+            else:
+                task = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+            self._tasks.add(task)
+            task.add_done_callback(lambda done: self._settle(key, future, done))
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _settle(self, key: str, future: Future, task: asyncio.Future):
+        """执行者的任务结束后设置共享结果"""
+        self._tasks.discard(task)
+        if task.cancelled():
+            # 只有事件循环关闭时任务才会被取消，不把 CancelledError 传给同步等待方
+            self._finish(key, future, error=RuntimeError(f"合并调用 {key} 被取消"))
+        elif task.exception() is not None:
+            self._finish(key, future, error=task.exception())
+        else:
+            self._finish(key, future, task.result())
+
+    def in_flight(self, key: str) -> bool:
+        """key 当前是否有正在执行的调用"""
+        with self._lock:
+            return key in self._calls
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取调用统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
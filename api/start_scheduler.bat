@@ -0,0 +1,15 @@
+@echo off
+
+rem 切换到脚本所在目录
+cd /d "%~dp0"
+
+rem 激活Python环境（如果需要）
+rem call activate your_env
+
+rem 启动常驻的抓取调度器（python scheduler.py），只需启动一次，例如开机自启
+rem 启动前请删除外部定时器中调用 update_hot_search.bat 的任务，两者同时使用会重复抓取；
+rem 也不要在设置了 SCHEDULER_EMBEDDED=true 的 API 进程之外再启动本脚本，除非配置了共享的 HOT_SEARCH_STORE
+python scheduler.py
+
+rem 暂停查看结果（可选）
+rem pause
\ No newline at end of file
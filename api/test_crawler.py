@@ -1,5 +1,7 @@
 from playwright.sync_api import sync_playwright
 
+from baidu_hot_spider import BOARD_URL
+
 def test_crawler():
     """
     测试爬虫是否能正确提取百度热搜数据
@@ -11,7 +13,8 @@ def test_crawler():
             page = browser.new_page()
             
             # 访问百度热搜实时榜单
-            url = "https://top.baidu.com/board?tab=realtime"
+            # 设置 BAIDU_BASE_URL 后访问本地替身服务器（upstream_standin.py）
+            url = BOARD_URL.format(category="realtime")
             print(f"访问URL: {url}")
             page.goto(url, timeout=30000)
             
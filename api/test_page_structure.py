@@ -1,5 +1,8 @@
 from playwright.sync_api import sync_playwright
 
+from baidu_hot_spider import BOARD_URL
+from board_crawler import BLOCKED_RESOURCE_TYPES, ITEM_SELECTOR
+
 """
 测试百度热搜页面结构
 """
@@ -19,14 +22,19 @@ def test_page_structure():
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             })
             
-            # 访问百度热搜页面
-            print("访问百度热搜页面...")
-            page.goto("https://top.baidu.com/board?tab=realtime", timeout=60000)
+            # 拦截图片、字体、样式等与页面结构无关的资源
+            page.route("**/*", lambda route: route.abort()
+                       if route.request.resource_type in BLOCKED_RESOURCE_TYPES else route.continue_())
+            
+            # 访问百度热搜页面，设置 BAIDU_BASE_URL 后访问本地替身服务器（upstream_standin.py）
+            url = BOARD_URL.format(category="realtime")
+            print(f"访问百度热搜页面 {url}...")
+            page.goto(url, timeout=60000, wait_until="domcontentloaded")
             print("页面访问成功")
             
-            # 等待页面加载完成
-            print("等待页面加载完成...")
-            page.wait_for_load_state('networkidle', timeout=30000)
+            # 等待热搜条目出现，不等待网络空闲
+            print("等待热搜条目加载...")
+            page.wait_for_selector(ITEM_SELECTOR, timeout=30000)
             print("页面加载完成")
             
             # 保存页面HTML到文件
@@ -1,12 +1,15 @@
 from playwright.sync_api import sync_playwright
 
+from baidu_hot_spider import BOARD_URL
+
 print('Testing Playwright installation...')
 
 try:
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         page = browser.new_page()
-        page.goto('https://www.baidu.com')
+        # 设置 BAIDU_BASE_URL 后访问本地替身服务器（upstream_standin.py）
+        page.goto(BOARD_URL.format(category='realtime'))
         title = page.title()
         print(f'Browser launched successfully! Page title: {title}')
         browser.close()
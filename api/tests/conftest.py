@@ -0,0 +1,31 @@
+"""
+测试公共配置
+api 目录下的模块以脚本方式互相导入（from hot_search_cache import ...），测试时把 api 目录加入导入路径
+基准测试不依赖 pytest-benchmark：bench 夹具用 perf_counter / process_time 计时并打印结果（pytest -s 查看），
+断言只针对确定性的结果（字节数、调用次数），不对耗时设阈值
+"""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def bench():
+    """
+    返回计时函数 bench(name, fn, rounds)，运行 fn rounds 次，
+    返回 {"wall": 每次平均耗时, "cpu": 每次平均 CPU 时间, "result": 最后一次的返回值}（秒）
+    """
+    def run(name, fn, rounds=100):
+        fn()
+        wall, cpu = time.perf_counter(), time.process_time()
+        for _ in range(rounds):
+            result = fn()
+        wall = (time.perf_counter() - wall) / rounds
+        cpu = (time.process_time() - cpu) / rounds
+        print(f"\n[bench] {name}: {wall * 1e6:.1f} us/次，CPU {cpu * 1e6:.1f} us/次（{rounds} 次）")
+        return {"wall": wall, "cpu": cpu, "result": result}
+    return run
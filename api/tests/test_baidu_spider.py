@@ -0,0 +1,110 @@
+"""
+百度热搜页面解析测试
+tests/fixtures/baidu 下保存了各分类的页面，按线上页面结构构造：内嵌 s-data 榜单 JSON、服务端渲染的条目 DOM、
+大段内联样式和脚本，部分条目缺少配图或描述
+"""
+import json
+import os
+import re
+import tracemalloc
+
+import pytest
+
+from baidu_hot_spider import HOT_SEARCH_CATEGORIES, MAX_ITEMS, BaiduHotSearchSpider
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "baidu")
+
+
+def load_page(name: str) -> bytes:
+    with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+        return f.read()
+
+
+def embedded_records(html: str):
+    """页面内嵌的榜单条目，作为解析结果的期望值"""
+    data = json.loads(re.search(r"<!--s-data:(.*?)-->", html, re.S).group(1))
+    card = data["data"]["cards"][0]
+    return (card["topContent"] + card["content"])[:MAX_ITEMS]
+
+
+@pytest.fixture(scope="module")
+def spider():
+    return BaiduHotSearchSpider()
+
+
+@pytest.mark.parametrize("category", HOT_SEARCH_CATEGORIES)
+def test_structured_parser_keeps_fields_aligned(spider, category):
+    html = load_page(f"{category}.html").decode("utf-8")
+    expected = embedded_records(html)
+
+    results = spider._parse_response(html, category)
+    assert [r["word"] for r in results] == [e["word"] for e in expected]
+    assert [r["img"] for r in results] == [e["img"] for e in expected]
+    assert [r["desc"] for r in results] == [e["desc"] for e in expected]
+
+    # 旧的正则解析在缺少配图或描述的条目之后整体错位
+    legacy = spider._build_results(spider._parse_with_regex(html))
+    assert [r["img"] for r in legacy] != [e["img"] for e in expected]
+
+
+@pytest.mark.parametrize("category", HOT_SEARCH_CATEGORIES)
+def test_benchmark_structured_vs_regex_parser(spider, bench, category):
+    html = load_page(f"{category}.html").decode("utf-8")
+    structured = bench(f"{category} 内嵌 JSON 解析（{len(html)} 字符）", lambda: spider._parse_response(html, category), rounds=50)
+    regex = bench(f"{category} 五次正则扫描", lambda: spider._build_results(spider._parse_with_regex(html)), rounds=50)
+    print(f"[bench] {category}: 正则 / 内嵌 JSON 耗时比 {regex['cpu'] / max(structured['cpu'], 1e-9):.1f}x")
+    assert len(structured["result"]) == len(regex["result"]) == MAX_ITEMS
+
+
+def legacy_decode(content: bytes) -> str:
+    """旧的逐个尝试编码的解码方式，errors="ignore" 使第一次尝试（utf-8）总是成功"""
+    for encoding in ("utf-8", "gbk", "gb2312", "gb18030"):
+        try:
+            return content.decode(encoding, errors="ignore")
+        except UnicodeDecodeError:
+            continue
+    return content.decode("utf-8", errors="ignore")
+
+
+def peak_allocation(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_gbk_page_is_decoded_from_meta_charset(spider):
+    content = load_page("realtime.gbk.html")
+    expected = [e["word"] for e in embedded_records(content.decode("gbk"))]
+
+    assert spider._detect_charset(content) == "gb18030"
+    assert spider._detect_charset(content, "text/html; charset=GBK") == "gb18030"
+    assert [r["word"] for r in spider._parse_content(content, "text/html", "realtime")] == expected
+    assert [r["word"] for r in BaiduHotSearchSpider(parse_bytes=False)._parse_content(content, None, "realtime")] == expected
+    # 旧方式按 utf-8 忽略错误解码，中文标题全部损坏
+    assert [r["word"] for r in spider._parse_response(legacy_decode(content), "realtime")] != expected
+
+
+@pytest.mark.parametrize("name, content_type", [
+    ("realtime.html", "text/html; charset=utf-8"),
+    ("realtime.gbk.html", "text/html"),
+])
+def test_benchmark_decoding_per_fetch(bench, name, content_type):
+    """每次抓取的解码 + 解析开销：旧的逐个尝试解码、按检测到的编码解码整页、只解码榜单 JSON 片段"""
+    content = load_page(name)
+    full_page = BaiduHotSearchSpider(parse_bytes=False)
+    bytes_only = BaiduHotSearchSpider(parse_bytes=True)
+    variants = {
+        "逐个尝试编码": lambda: full_page._parse_response(legacy_decode(content), "realtime"),
+        "按编码解码整页": lambda: full_page._parse_content(content, content_type, "realtime"),
+        "只解码榜单片段": lambda: bytes_only._parse_content(content, content_type, "realtime"),
+    }
+    peaks = {}
+    for label, fn in variants.items():
+        bench(f"{name} {label}", fn, rounds=50)
+        peaks[label] = peak_allocation(fn)
+        print(f"[bench] {name} {label}: 峰值分配 {peaks[label] / 1024:.0f} KiB")
+    # 不再为整个页面分配解码后的字符串
+    assert peaks["只解码榜单片段"] < peaks["按编码解码整页"]
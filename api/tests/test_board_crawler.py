@@ -0,0 +1,167 @@
+"""
+浏览器爬虫测试
+本地 HTTP 服务按 /board?tab=分类 返回 tests/fixtures/baidu 下保存的页面，每个页面带固定延迟；
+需要安装 playwright 和 chromium，未安装时跳过浏览器相关的测试
+"""
+import asyncio
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import board_crawler
+from baidu_hot_spider import HOT_SEARCH_CATEGORIES
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "baidu")
+
+# 替身服务器返回每个页面前的延迟（秒），模拟上游响应时间
+PAGE_LATENCY = 0.5
+
+
+class BoardHandler(BaseHTTPRequestHandler):
+    """记录同时处理中的页面请求数的峰值，用来确认抓取是否并发"""
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        category = parse_qs(parsed.query).get("tab", [""])[0]
+        path = os.path.join(FIXTURE_DIR, f"{category}.html")
+        if parsed.path != "/board" or category not in HOT_SEARCH_CATEGORIES:
+            self.send_error(404)
+            return
+        with BoardHandler.lock:
+            BoardHandler.in_flight += 1
+            BoardHandler.max_in_flight = max(BoardHandler.max_in_flight, BoardHandler.in_flight)
+        time.sleep(PAGE_LATENCY)
+        with BoardHandler.lock:
+            BoardHandler.in_flight -= 1
+        with open(path, "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def board_server(monkeypatch):
+    """启动本地页面服务并把爬虫的榜单地址指向它"""
+    pytest.importorskip("playwright.async_api")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BoardHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(board_crawler, "BOARD_URL", f"http://127.0.0.1:{server.server_address[1]}/board?tab={{category}}")
+    yield
+    server.shutdown()
+    server.server_close()
+
+
+def test_benchmark_concurrent_vs_sequential_crawl(board_server):
+    """一个浏览器、有界上下文池并发抓取全部分类，对比逐个分类抓取的总耗时"""
+    results, concurrency = {}, {}
+    for label, contexts in (("逐个分类", 1), ("并发", len(HOT_SEARCH_CATEGORIES))):
+        BoardHandler.max_in_flight = 0
+        crawler = board_crawler.BrowserBoardCrawler(max_contexts=contexts)
+        start = time.perf_counter()
+        boards = asyncio.run(crawler.crawl(HOT_SEARCH_CATEGORIES))
+        results[label] = time.perf_counter() - start
+        concurrency[label] = BoardHandler.max_in_flight
+        print(f"[bench] {label}抓取 {len(HOT_SEARCH_CATEGORIES)} 个分类：总耗时 {results[label]:.2f} 秒，"
+              + "，".join(f"{category} {seconds} 秒" for category, seconds in crawler.timings.items()))
+        assert all(len(boards[category]) == board_crawler.MAX_ITEMS for category in HOT_SEARCH_CATEGORIES)
+        assert set(crawler.timings) == set(HOT_SEARCH_CATEGORIES)
+    # 只对确定性的结果断言：上下文池大小决定同时请求的页面数，耗时只打印
+    assert concurrency["逐个分类"] == 1
+    assert concurrency["并发"] > 1
+
+
+def test_page_deadline_gives_up_on_slow_category(board_server, monkeypatch):
+    monkeypatch.setattr(board_crawler, "ITEM_SELECTOR", ".missing-selector")
+    crawler = board_crawler.BrowserBoardCrawler(page_deadline=PAGE_LATENCY + 1)
+    boards = asyncio.run(crawler.crawl(["realtime"]))
+    assert boards == {"realtime": []}
+    assert "realtime" in crawler.timings
+
+
+def test_normalize_board_items_dedupes_and_resolves_links():
+    raw_items = [
+        {"title": "  第一条\n热搜 ", "url": "/s?wd=1", "image_url": "//fyb-1.cdn.bcebos.com/a.jpg", "hot_index": " 4990000 "},
+        {"title": "第一条 热搜", "url": "/s?wd=dup", "image_url": "", "hot_index": "1"},
+        {"title": "", "url": "/s?wd=blank", "image_url": "", "hot_index": ""},
+        {"title": "第二条", "url": "https://www.baidu.com/s?wd=2", "image_url": "", "hot_index": "4980000"},
+    ]
+    items = board_crawler.normalize_board_items(raw_items, "realtime")
+    assert [(item["rank"], item["title"]) for item in items] == [(1, "第一条 热搜"), (2, "第二条")]
+    assert items[0]["url"] == "https://top.baidu.com/s?wd=1"
+    assert items[0]["image_url"] == "https://fyb-1.cdn.bcebos.com/a.jpg"
+    assert items[0]["hot_index"] == "4990000"
+    assert items[1]["url"] == "https://www.baidu.com/s?wd=2"
+
+
+async def legacy_extract(page):
+    """旧的逐个元素提取方式，返回 (原始条目, 浏览器往返次数)"""
+    round_trips = 1
+    elements = await page.query_selector_all(board_crawler.ITEM_SELECTOR)
+    raw_items = []
+    for element in elements[:board_crawler.MAX_ITEMS]:
+        title = await element.query_selector(board_crawler.TITLE_SELECTOR)
+        link = await element.query_selector("a")
+        image = await element.query_selector("img")
+        hot_index = await element.query_selector(board_crawler.HOT_INDEX_SELECTOR)
+        round_trips += 4
+        raw = {"title": "", "url": "", "image_url": "", "hot_index": ""}
+        for key, handle, read in (
+            ("title", title, lambda h: h.text_content()),
+            ("url", link, lambda h: h.get_attribute("href")),
+            ("image_url", image, lambda h: h.get_attribute("src")),
+            ("hot_index", hot_index, lambda h: h.text_content()),
+        ):
+            if handle is not None:
+                raw[key] = await read(handle) or ""
+                round_trips += 1
+        raw_items.append(raw)
+    return raw_items, round_trips
+
+
+def test_benchmark_one_shot_extraction_round_trips():
+    """在保存的页面上对比逐个元素提取和一次 page.evaluate 提取的耗时与浏览器往返次数"""
+    async_api = pytest.importorskip("playwright.async_api")
+    with open(os.path.join(FIXTURE_DIR, "realtime.html"), encoding="utf-8") as f:
+        html = f.read()
+    rounds = 20
+
+    async def run():
+        async with async_api.async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                page = await browser.new_page()
+                await page.set_content(html)
+                crawler = board_crawler.BrowserBoardCrawler()
+
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    raw_items, round_trips = await legacy_extract(page)
+                legacy_seconds = (time.perf_counter() - start) / rounds
+
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    items = await crawler._extract(page, "realtime")
+                one_shot_seconds = (time.perf_counter() - start) / rounds
+            finally:
+                await browser.close()
+        return raw_items, round_trips, legacy_seconds, items, one_shot_seconds
+
+    raw_items, round_trips, legacy_seconds, items, one_shot_seconds = asyncio.run(run())
+    print(f"\n[bench] 逐个元素提取：{round_trips} 次往返，{legacy_seconds * 1000:.1f} ms；"
+          f"page.evaluate 一次提取：1 次往返，{one_shot_seconds * 1000:.1f} ms")
+    assert items == board_crawler.normalize_board_items(raw_items, "realtime")
+    assert len(items) == board_crawler.MAX_ITEMS
+    assert round_trips > 100
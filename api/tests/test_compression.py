@@ -0,0 +1,54 @@
+"""分页响应压缩测试：缓存的分页预压缩，不缓存的分页按请求用较快的级别即时压缩"""
+import gzip
+import time
+from types import SimpleNamespace
+
+import hot_search_cache
+from compression import SUPPORTED_ENCODINGS, compress, negotiated_response
+from hot_search_cache import HotSearchSnapshot
+
+
+def make_snapshot(n=50):
+    items = [
+        {
+            "word": f"第{i}条热搜：某地发布重要通知，涉及交通出行和天气变化",
+            "desc": "相关话题讨论量持续上升" * 3,
+            "hot_score": str(4_900_000 - i * 37_000),
+            "url": f"https://www.baidu.com/s?wd=%E7%83%AD%E6%90%9C{i}&sa=fyb_news&rsv_dl=fyb_news",
+            "img": f"https://fyb-2.cdn.bcebos.com/hotboard_image/{i:032x}",
+        }
+        for i in range(n)
+    ]
+    return HotSearchSnapshot("realtime", items, fetched_at=time.time(), created_at="2026-10-18 12:00:00", version=1)
+
+
+def request_with(accept_encoding):
+    return SimpleNamespace(headers={"accept-encoding": accept_encoding})
+
+
+def test_pages_past_the_cache_limit_are_not_precompressed(monkeypatch):
+    monkeypatch.setattr(hot_search_cache, "MAX_RENDERED_PAGES", 1)
+    snapshot = make_snapshot()
+
+    cached = snapshot.get_page(1, 20)
+    assert set(cached.encodings) == set(SUPPORTED_ENCODINGS)
+
+    uncached = snapshot.get_page(2, 20)
+    assert uncached.encodings == {}
+    assert list(snapshot.pages) == [(1, 20)]
+
+    response = negotiated_response(request_with("gzip"), uncached, {})
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.body) == uncached.body
+    assert response.body == compress(uncached.body, "gzip")
+
+
+def test_benchmark_precompress_vs_on_the_fly_levels(bench):
+    """对比最高级别（预压缩）和即时压缩级别的字节数与 CPU 时间"""
+    body = make_snapshot()._render_page(1, 50, precompressed=False).body
+    for encoding in SUPPORTED_ENCODINGS:
+        slow = bench(f"{encoding} 预压缩级别（{len(body)} 字节）", lambda: compress(body, encoding, precompress=True), rounds=50)
+        fast = bench(f"{encoding} 即时压缩级别（{len(body)} 字节）", lambda: compress(body, encoding), rounds=50)
+        print(f"[bench] {encoding}: 预压缩 {len(slow['result'])} 字节，即时压缩 {len(fast['result'])} 字节")
+        # 即时压缩级别的压缩率损失很小
+        assert len(fast["result"]) <= len(slow["result"]) * 1.1
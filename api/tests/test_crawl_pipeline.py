@@ -0,0 +1,46 @@
+import crawl_pipeline
+from crawl_pipeline import TIER_BROWSER, TIER_HTTP, count_missing_titles, validate_board
+
+
+def http_items(count, blank=0):
+    return [
+        {"word": "" if i < blank else f"热搜 {i}", "url": f"/s?wd={i}", "img": "", "hot_score": str(1000 - i)}
+        for i in range(count)
+    ]
+
+
+def browser_items(category, count):
+    return [
+        {"rank": i + 1, "title": f"浏览器 {i}", "url": "", "image_url": "", "hot_index": "", "category": category}
+        for i in range(count)
+    ]
+
+
+def test_missing_titles_are_counted_before_normalizing():
+    raw = http_items(30, blank=5)
+    assert count_missing_titles(raw) == 5
+    assert count_missing_titles([{"word": "  \n"}, {"word": None}, {}]) == 3
+
+    board = crawl_pipeline.http_items_to_board(raw, "realtime")
+    assert len(board) == 25
+    assert validate_board(board) is None
+    assert validate_board(board, missing_titles=count_missing_titles(raw)) == "5 条缺少标题"
+
+
+def test_blank_http_titles_escalate_to_browser(monkeypatch):
+    monkeypatch.setattr(crawl_pipeline, "_fetch_http", lambda categories: {
+        "realtime": http_items(30),
+        "novel": http_items(30, blank=3),
+    })
+    requested = []
+
+    def fake_crawl_boards(categories):
+        requested.extend(categories)
+        return {category: browser_items(category, 30) for category in categories}
+
+    monkeypatch.setattr(crawl_pipeline, "crawl_boards", fake_crawl_boards)
+    boards, tiers = crawl_pipeline.crawl_with_fallback(["realtime", "novel"])
+
+    assert requested == ["novel"]
+    assert tiers == {"realtime": TIER_HTTP, "novel": TIER_BROWSER}
+    assert boards["novel"][0]["title"] == "浏览器 0"
@@ -0,0 +1,26 @@
+"""热搜快照缓存测试"""
+from hot_search_cache import HotSearchCache
+
+
+def make_items(n=5):
+    return [{"word": f"话题{i}", "desc": "", "hot_score": str(100 - i), "url": "", "img": ""} for i in range(n)]
+
+
+def test_unknown_category_is_rejected_before_fetch():
+    calls = []
+
+    def fetcher(category, known_hash):
+        calls.append(category)
+        return make_items(), "hash"
+
+    cache = HotSearchCache(fetcher, categories=["realtime"])
+    for category in ("../../x", "a/b", "unknown"):
+        assert cache.get_snapshot(category) is None
+        assert cache.refresh(category) is None
+        assert cache.get_changes(category, None) is None
+        assert cache.sync_from_store(category) is None
+    assert calls == []
+    assert set(cache._breakers) == {"realtime"}
+    assert cache._snapshots == {} and cache._recent == {}
+    assert cache.get_snapshot("realtime") is not None
+    assert calls == ["realtime"]
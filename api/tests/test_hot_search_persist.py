@@ -0,0 +1,65 @@
+"""热搜快照落盘与冷启动预热测试"""
+import json
+import os
+import time
+
+from baidu_hot_spider import BaiduHotSearchSpider
+from hot_search_cache import DEFAULT_PAGE_SIZE, HotSearchCache
+from hot_search_persist import SnapshotPersistence
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "baidu")
+
+# 模拟一次上游抓取的网络耗时（秒）
+UPSTREAM_LATENCY = 0.3
+
+
+def make_fetcher(calls):
+    spider = BaiduHotSearchSpider()
+    with open(os.path.join(FIXTURE_DIR, "realtime.html"), "rb") as f:
+        content = f.read()
+
+    def fetcher(category, known_hash):
+        calls.append(category)
+        time.sleep(UPSTREAM_LATENCY)
+        return spider._parse_content(content, "text/html; charset=utf-8", category), "hash"
+
+    return fetcher
+
+
+def first_byte(cache: HotSearchCache) -> bytes:
+    """进程启动后的第一个请求：取第一页的响应字节"""
+    return cache.get_snapshot("realtime").get_page(1, DEFAULT_PAGE_SIZE).body
+
+
+def test_benchmark_cold_start_time_to_first_byte(tmp_path):
+    persistence = SnapshotPersistence(str(tmp_path))
+
+    # 上一个进程：抓取一次并落盘
+    calls = []
+    previous = HotSearchCache(make_fetcher(calls), categories=["realtime"])
+    previous.add_listener(lambda snapshot: persistence.save(snapshot.category, snapshot.to_record()))
+    expected = first_byte(previous)
+    assert os.path.exists(persistence.path)
+
+    # 没有快照文件的冷启动：第一个请求等待抓取
+    calls = []
+    start = time.perf_counter()
+    cold = HotSearchCache(make_fetcher(calls), categories=["realtime"])
+    cold_body = first_byte(cold)
+    cold_ttfb = time.perf_counter() - start
+    assert calls == ["realtime"]
+
+    # 从快照文件预热：第一个请求直接返回落盘的快照，刷新在后台进行
+    calls = []
+    start = time.perf_counter()
+    warm = HotSearchCache(make_fetcher(calls), categories=["realtime"], ttls={"realtime": 3600})
+    assert warm.warm_start(SnapshotPersistence(str(tmp_path)).load()) == 1
+    warm_body = first_byte(warm)
+    warm_ttfb = time.perf_counter() - start
+
+    print(f"\n[bench] 冷启动首字节时间：无快照文件 {cold_ttfb * 1000:.1f} ms，"
+          f"从快照文件预热 {warm_ttfb * 1000:.1f} ms（{os.path.getsize(persistence.path)} 字节）")
+    assert json.loads(warm_body)["data"] == json.loads(expected)["data"]
+    assert [item["title"] for item in json.loads(cold_body)["data"]] == [item["title"] for item in json.loads(expected)["data"]]
+    # 预热后第一个请求不等待上游抓取
+    assert calls == []
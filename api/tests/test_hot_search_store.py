@@ -0,0 +1,162 @@
+"""快照共享存储测试：本地目录上的 FileStore 和内存中的假 Redis"""
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import hot_search_store
+from hot_search_store import FileStore, MemoryStore, RedisStore
+
+
+class FakeRedis:
+    """只实现 RedisStore 用到的命令，两个注册脚本按脚本内容模拟"""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def _alive(self, key):
+        if key in self.expires and self.expires[key] <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def get(self, key):
+        return self.data[key] if self._alive(key) else None
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and self._alive(key):
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        if px is not None:
+            self.expires[key] = time.time() + px / 1000
+        return True
+
+    def pexpire(self, key, px):
+        self.expires[key] = time.time() + px / 1000
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        fields = self.data.setdefault(key, {})
+        for name, item in (mapping or {field: value}).items():
+            fields[name] = str(item).encode()
+
+    def hmget(self, key, *fields):
+        stored = self.data.get(key, {})
+        return [stored.get(name) for name in fields]
+
+    def pipeline(self, transaction=True):
+        client = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+            def execute(self):
+                return [getattr(client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+        return Pipeline()
+
+    def register_script(self, script):
+        def run(keys, args):
+            key = keys[0]
+            if script is hot_search_store._RELEASE_SCRIPT:
+                if self.get(key) == args[0].encode():
+                    self.data.pop(key, None)
+                    return 1
+                return 0
+            stored = self.data.get(key, {})
+            if stored.get("version") == args[0].encode():
+                stored["checked_at"] = args[1].encode()
+                return 1
+            return 0
+        return run
+
+
+def make_redis_store():
+    store = RedisStore.__new__(RedisStore)
+    store.client = FakeRedis()
+    store.prefix = "hot_search"
+    store._release = store.client.register_script(hot_search_store._RELEASE_SCRIPT)
+    store._touch = store.client.register_script(hot_search_store._TOUCH_SCRIPT)
+    return store
+
+
+@pytest.fixture(params=["memory", "file", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStore()
+    if request.param == "file":
+        return FileStore(str(tmp_path))
+    return make_redis_store()
+
+
+def record(version, checked_at=1.0):
+    return {"version": version, "checked_at": checked_at, "category": "realtime", "items": []}
+
+
+def test_save_and_load(store):
+    store.save("realtime", record(1))
+    assert store.peek_meta("realtime") == (1, 1.0)
+    assert store.load("realtime")["version"] == 1
+
+
+def test_touch_only_updates_matching_version(store):
+    store.save("realtime", record(2))
+    store.touch("realtime", 1, 50.0)
+    assert store.peek_meta("realtime") == (2, 1.0)
+    store.touch("realtime", 2, 60.0)
+    assert store.peek_meta("realtime") == (2, 60.0)
+
+
+def test_touch_without_snapshot_is_noop(store):
+    store.touch("realtime", 1, 50.0)
+    assert store.peek_meta("realtime") is None
+
+
+def test_lease_is_exclusive_and_renewable(store):
+    assert store.acquire_lease("refresh_realtime", "a", 30)
+    assert store.acquire_lease("refresh_realtime", "a", 30)
+    assert not store.acquire_lease("refresh_realtime", "b", 30)
+    store.release_lease("refresh_realtime", "b")
+    assert not store.acquire_lease("refresh_realtime", "b", 30)
+    store.release_lease("refresh_realtime", "a")
+    assert store.acquire_lease("refresh_realtime", "b", 30)
+
+
+def test_file_lease_expires_by_mtime(tmp_path):
+    store = FileStore(str(tmp_path))
+    assert store.acquire_lease("refresh_realtime", "a", 30)
+    path = store._path("refresh_realtime.lease")
+    os.utime(path, (time.time() - 60, time.time() - 60))
+    assert store.acquire_lease("refresh_realtime", "b", 30)
+    # 过期持有者的释放不能删除接管者的租约
+    store.release_lease("refresh_realtime", "a")
+    assert not store.acquire_lease("refresh_realtime", "a", 30)
+
+
+def test_file_lease_unreadable_file_is_not_expired(tmp_path):
+    store = FileStore(str(tmp_path))
+    open(store._path("refresh_realtime.lease"), "wb").close()
+    assert not store.acquire_lease("refresh_realtime", "b", 30)
+
+
+def _race(directory, owner, start, results):
+    start.wait()
+    results.put((owner, FileStore(directory).acquire_lease("refresh_realtime", owner, 30)))
+
+
+def test_file_lease_single_winner_across_processes(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    start = ctx.Barrier(8)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_race, args=(str(tmp_path), f"w{i}", start, results)) for i in range(8)]
+    for proc in procs:
+        proc.start()
+    outcomes = [results.get(timeout=30) for _ in procs]
+    for proc in procs:
+        proc.join()
+    assert sum(1 for _, won in outcomes if won) == 1
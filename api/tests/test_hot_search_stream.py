@@ -0,0 +1,182 @@
+"""热搜推送测试"""
+import asyncio
+import json
+import threading
+import time
+import tracemalloc
+
+from hot_search_cache import HotSearchCache, HotSearchSnapshot
+from hot_search_stream import HotSearchBroadcaster
+
+
+def make_cache():
+    state = {"round": 0}
+
+    def fetcher(category, known_hash):
+        n = state["round"]
+        items = [{"word": f"话题{n}-{i}", "desc": "", "hot_score": str(100 - i), "url": "", "img": ""} for i in range(10)]
+        return items, str(n)
+
+    cache = HotSearchCache(fetcher, categories=["realtime"], ttls={"realtime": 3600})
+    return cache, state
+
+
+async def update(cache, state):
+    """让上游内容变化并强制刷新；平时快照不过期，读取时不会触发后台刷新"""
+    state["round"] += 1
+    cache.ttls["realtime"] = -1
+    try:
+        return await asyncio.to_thread(cache.refresh, "realtime")
+    finally:
+        cache.ttls["realtime"] = 3600
+
+
+def parse(frame):
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return fields["event"], int(fields["id"]), json.loads(fields["data"])
+
+
+def test_new_subscriber_gets_no_duplicate_and_diffs_from_its_snapshot():
+    async def run():
+        cache, state = make_cache()
+        broadcaster = HotSearchBroadcaster(cache, heartbeat=3600)
+        broadcaster.bind(asyncio.get_running_loop())
+        cache.add_listener(broadcaster.publish)
+
+        # 没有订阅者时产生的版本不会推送给之后连接的客户端
+        await update(cache, state)
+        await update(cache, state)
+        stream = broadcaster.stream(["realtime"])
+        event, version, _ = parse(await stream.__anext__())
+        assert (event, version) == ("snapshot", cache.peek("realtime").version)
+
+        # 订阅后才执行的、针对已发送版本的广播不产生重复事件
+        await broadcaster._broadcast("realtime")
+        next_frame = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        assert not next_frame.done()
+
+        await update(cache, state)
+        event, new_version, data = parse(await asyncio.wait_for(next_frame, 5))
+        assert event == "changes"
+        assert new_version == cache.peek("realtime").version
+        assert data["since"] == version and not data.get("full")
+        await stream.aclose()
+
+    asyncio.run(run())
+
+
+def test_missed_publish_is_diffed_from_each_subscribers_version():
+    async def run():
+        cache, state = make_cache()
+        broadcaster = HotSearchBroadcaster(cache, heartbeat=3600)
+        loop = asyncio.get_running_loop()
+        broadcaster.bind(loop)
+        cache.add_listener(broadcaster.publish)
+
+        await update(cache, state)
+        streams = [broadcaster.stream(["realtime"]) for _ in range(3)]
+        versions = [parse(await stream.__anext__())[1] for stream in streams]
+
+        # 漏掉一次推送（例如推送时未绑定事件循环），下一次推送仍从客户端持有的版本计算差异
+        broadcaster._loop = None
+        await update(cache, state)
+        broadcaster.bind(loop)
+        latest = await update(cache, state)
+
+        for stream, version in zip(streams, versions):
+            event, event_id, data = parse(await asyncio.wait_for(stream.__anext__(), 5))
+            assert (event, event_id, data["since"]) == ("changes", latest.version, version)
+            assert not data.get("full")
+        # 持有相同版本的客户端共用同一帧
+        assert broadcaster.get_stats()["events"] == 1
+        assert broadcaster.get_stats()["delivered"] == 3
+        for stream in streams:
+            await stream.aclose()
+
+    asyncio.run(run())
+
+
+def test_changes_are_rendered_off_the_event_loop(monkeypatch):
+    """首次渲染变化时会做最高级别的预压缩，不能在事件循环线程中执行"""
+    async def run():
+        cache, state = make_cache()
+        broadcaster = HotSearchBroadcaster(cache, heartbeat=3600)
+        broadcaster.bind(asyncio.get_running_loop())
+        cache.add_listener(broadcaster.publish)
+        await update(cache, state)
+
+        threads = []
+        get_changes = HotSearchSnapshot.get_changes
+
+        def recording_get_changes(snapshot, since, base):
+            threads.append(threading.get_ident())
+            return get_changes(snapshot, since, base)
+
+        monkeypatch.setattr(HotSearchSnapshot, "get_changes", recording_get_changes)
+        stream = broadcaster.stream(["realtime"])
+        await stream.__anext__()
+        await update(cache, state)
+        await asyncio.wait_for(stream.__anext__(), 5)
+        await stream.aclose()
+        return threads
+
+    threads = asyncio.run(run())
+    assert len(threads) == 2
+    assert threading.get_ident() not in threads
+
+
+def test_load_idle_connection_memory_and_cpu():
+    """大量空闲连接的内存占用、心跳 CPU 和一次广播的 CPU"""
+    connections = 500
+    heartbeat = 0.05
+
+    async def run():
+        cache, state = make_cache()
+        await update(cache, state)
+        broadcaster = HotSearchBroadcaster(cache, heartbeat=heartbeat)
+        broadcaster.bind(asyncio.get_running_loop())
+        cache.add_listener(broadcaster.publish)
+        received = {"heartbeats": 0, "changes": 0}
+
+        async def client():
+            async for frame in broadcaster.stream(["realtime"]):
+                if frame.startswith(b":"):
+                    received["heartbeats"] += 1
+                elif b"event: changes" in frame:
+                    received["changes"] += 1
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tasks = [asyncio.ensure_future(client()) for _ in range(connections)]
+        while broadcaster.get_stats()["subscribers"] < connections or any(
+            "realtime" not in s.versions for s in broadcaster._subscribers
+        ):
+            await asyncio.sleep(0.01)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        per_connection = sum(stat.size_diff for stat in after.compare_to(before, "filename")) / connections
+
+        received["heartbeats"] = 0
+        cpu = time.process_time()
+        await asyncio.sleep(heartbeat * 10)
+        heartbeat_cpu = (time.process_time() - cpu) / max(received["heartbeats"], 1)
+
+        cpu = time.process_time()
+        await update(cache, state)
+        while received["changes"] < connections:
+            await asyncio.sleep(0.01)
+        broadcast_cpu = (time.process_time() - cpu) / connections
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return per_connection, heartbeat_cpu, broadcast_cpu, broadcaster.get_stats()
+
+    per_connection, heartbeat_cpu, broadcast_cpu, stats = asyncio.run(run())
+    print(f"\n[bench] {connections} 个空闲连接：每连接内存 {per_connection / 1024:.1f} KiB，"
+          f"每次心跳 CPU {heartbeat_cpu * 1e6:.1f} us，每连接广播 CPU {broadcast_cpu * 1e6:.1f} us")
+    assert stats["events"] == 1
+    assert stats["delivered"] == connections
+    assert stats["subscribers"] == 0
+    assert per_connection < 64 * 1024
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import image_proxy
+from image_proxy import DiskLRUCache, ImageProxy
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(document.domain)</script></svg>'
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    """本地图片替身：/logo.png 返回图片，/page.html 返回网页，/evil.svg 返回带脚本的 SVG，/away 重定向到白名单外的地址"""
+    requests = []
+
+    def do_GET(self):
+        ImageHandler.requests.append(self.path)
+        if self.path == "/logo.png":
+            self._send(200, "image/png", PNG)
+        elif self.path == "/evil.svg":
+            self._send(200, "image/svg+xml", SVG)
+        elif self.path == "/favicon.ico":
+            self._send(200, "image/x-icon", b"\x00\x00\x01\x00" + b"\x00" * 32)
+        elif self.path == "/page.html":
+            self._send(200, "text/html", b"<html></html>")
+        elif self.path == "/away":
+            self.send_response(302)
+            self.send_header("Location", "http://example.com/logo.png")
+            self.end_headers()
+        else:
+            self._send(404, "text/plain", b"not found")
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def image_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    ImageHandler.requests = []
+    monkeypatch.setattr(image_proxy, "ALLOWED_HOSTS", ("127.0.0.1",))
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def proxy(tmp_path):
+    return ImageProxy(cache=DiskLRUCache(str(tmp_path / "images")))
+
+
+def test_default_allowlist_covers_hot_search_images():
+    proxy = ImageProxy.__new__(ImageProxy)
+    assert proxy.is_allowed("https://fyb-1.cdn.bcebos.com/hotboard_image/abc.jpeg")
+    assert proxy.is_allowed("https://img.bosszhipin.com/logo.png")
+    assert not proxy.is_allowed("https://evilbcebos.com/x.png")
+    assert not proxy.is_allowed("file:///etc/passwd")
+
+
+def test_fetches_once_then_serves_from_disk(image_server, proxy):
+    url = f"{image_server}/logo.png"
+
+    async def run():
+        try:
+            results = await asyncio.gather(*(proxy.get_image(url) for _ in range(20)))
+            again = await proxy.get_image(url)
+        finally:
+            await proxy.close()
+        return results, again
+
+    results, again = asyncio.run(run())
+    assert all(result == (PNG, "image/png", results[0][2]) for result in results)
+    assert again == results[0]
+    assert ImageHandler.requests == ["/logo.png"]
+    assert proxy.get_stats()["cache"]["entries"] == 1
+
+
+def test_rejects_non_images_and_redirects_off_the_allowlist(image_server, proxy):
+    async def run():
+        try:
+            return await proxy.get_image(f"{image_server}/page.html"), await proxy.get_image(f"{image_server}/away")
+        finally:
+            await proxy.close()
+
+    assert asyncio.run(run()) == (None, None)
+    assert proxy.get_stats()["failed"] == 2
+
+
+def test_svg_and_ico_are_not_proxied(image_server, proxy):
+    """SVG 可以内嵌脚本，从 API 源返回会成为存储型 XSS；只代理能重新编码的位图"""
+    async def run():
+        try:
+            return await proxy.get_image(f"{image_server}/evil.svg"), await proxy.get_image(f"{image_server}/favicon.ico", 64)
+        finally:
+            await proxy.close()
+
+    assert asyncio.run(run()) == (None, None)
+    assert "image/svg+xml" not in image_proxy.MEDIA_EXTENSIONS
+    assert proxy.get_stats()["cache"]["entries"] == 0
+
+
+def test_thumbnail_pool_uses_spawn(proxy):
+    async def run():
+        try:
+            result = await proxy._make_thumbnail(PNG, 64, "JPEG")
+            return result, proxy._pool._mp_context.get_start_method()
+        finally:
+            await proxy.close()
+
+    result, method = asyncio.run(run())
+    assert method == "spawn"
+    if image_proxy.Image is None:
+        assert result is None
+
+
+def test_endpoint_sends_nosniff_and_sandbox(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    async def fake_get_image(url, width=None, accept=""):
+        return PNG, "image/png", '"etag"'
+
+    monkeypatch.setattr(main.image_proxy, "get_image", fake_get_image)
+    client = TestClient(main.app)
+    response = client.get("/api/img", params={"url": "https://fyb-1.cdn.bcebos.com/a.png"})
+    assert response.status_code == 200
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["content-security-policy"] == "sandbox"
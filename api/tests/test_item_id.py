@@ -0,0 +1,23 @@
+"""条目 ID 测试"""
+import os
+import subprocess
+import sys
+
+import item_id
+
+
+def test_item_id_is_normalized():
+    assert item_id.make_item_id("ＡＢＣ  热搜\n话题") == item_id.make_item_id("abc 热搜 话题")
+    assert item_id.make_item_id("") == item_id.make_item_id(None)
+    assert item_id.make_item_id("话题一") != item_id.make_item_id("话题二")
+    assert len(item_id.make_item_id("话题")) == 16
+
+
+def test_crawlers_and_history_do_not_import_the_cache():
+    """爬虫和历史记录单独导入时不加载快照缓存"""
+    code = (
+        "import sys, board_crawler, crawl_pipeline, hot_search_history, item_id\n"
+        "assert 'hot_search_cache' not in sys.modules, 'hot_search_cache imported'\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(item_id.__file__)), capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
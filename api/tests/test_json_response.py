@@ -0,0 +1,88 @@
+"""快速 JSON 响应测试：各高频接口的响应体与 FastAPI 默认路径一致，并对比两者的开销"""
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from hot_search_cache import format_hot_search_item
+from json_response import FastJSONResponse
+
+
+def job_row(i: int) -> Dict[str, Any]:
+    """与 JobsDB 查询结果相同字段的职位"""
+    return {
+        "id": 1000 + i,
+        "job_id": f"{i:024x}",
+        "job_name": f"Python 后端开发工程师（外企）{i}",
+        "company_name": f"某跨国科技有限公司{i}",
+        "company_logo": f"https://img.bosszhipin.com/beijin/upload/com/logo/{i:032x}.png",
+        "salary_range": "25-40K·14薪",
+        "salary_min": 25,
+        "salary_max": 40,
+        "city": "西安",
+        "district": "高新区",
+        "experience": "3-5年",
+        "education": "本科",
+        "company_scale": "1000-9999人",
+        "company_industry": "互联网",
+        "finance_stage": "已上市",
+        "job_benefits": ["五险一金", "带薪年假", "弹性工作", "定期体检"],
+        "posted_time": "刚刚",
+        "job_detail_url": f"https://www.zhipin.com/job_detail/{i:024x}.html",
+    }
+
+
+def hot_item(i: int) -> Dict[str, Any]:
+    item = {"word": f"热搜话题{i}", "desc": "", "hot_score": str(4_900_000 - i), "url": f"https://www.baidu.com/s?wd={i}", "img": ""}
+    return format_hot_search_item(item, i + 1, "realtime", "2026-10-18 12:00:00")
+
+
+# 接口 -> (响应数据, 原来声明的 response_model)
+ENDPOINTS = {
+    "jobs": ({"data": [job_row(i) for i in range(10)], "total": 500, "page": 1, "page_size": 10}, None),
+    "jobs_page_50": ({"data": [job_row(i) for i in range(50)], "total": 500, "page": 1, "page_size": 50}, None),
+    "job_detail": ({"data": dict(job_row(1), crawled_at=datetime(2026, 10, 18, 12, 0, 0), salary_avg=Decimal("32.5"))}, None),
+    "hot_search_item": (hot_item(0), Dict[str, Any]),
+    "hot_search_rank": (hot_item(4), Dict[str, Any]),
+    "health": ({"status": "healthy", "database": "connected", "latency_ms": Decimal("1.25"), "checked_at": datetime(2026, 10, 18)}, None),
+}
+
+
+def build_app() -> FastAPI:
+    """每个接口两条路由：before 为 FastAPI 默认路径（返回字典，经过 response_model 和 jsonable_encoder），after 直接返回 FastJSONResponse"""
+    app = FastAPI()
+    for name, (payload, response_model) in ENDPOINTS.items():
+        def before(payload=payload):
+            return payload
+
+        def after(payload=payload):
+            return FastJSONResponse(payload)
+
+        app.add_api_route(f"/before/{name}", before, response_model=response_model)
+        app.add_api_route(f"/after/{name}", after)
+    return app
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(build_app(), headers={"Accept-Encoding": "identity"}) as client:
+        yield client
+
+
+@pytest.mark.parametrize("name", list(ENDPOINTS))
+def test_fast_response_matches_default_encoding(client, name):
+    before = client.get(f"/before/{name}")
+    after = client.get(f"/after/{name}")
+    assert before.status_code == after.status_code == 200
+    assert json.loads(after.content) == json.loads(before.content)
+
+
+@pytest.mark.parametrize("name", list(ENDPOINTS))
+def test_benchmark_endpoint_before_after(client, bench, name):
+    before = bench(f"{name} 默认 JSONResponse", lambda: client.get(f"/before/{name}"), rounds=200)
+    after = bench(f"{name} FastJSONResponse", lambda: client.get(f"/after/{name}"), rounds=200)
+    print(f"[bench] {name}: 每次请求节省 CPU {(before['cpu'] - after['cpu']) * 1e6:.1f} us")
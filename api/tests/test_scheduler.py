@@ -0,0 +1,40 @@
+import asyncio
+import sys
+import types
+
+import pytest
+
+import scheduler
+from crawl_pipeline import TIER_FAILED, TIER_HTTP, TIER_PARTIAL
+from scheduler import JobLedger, Scheduler
+
+
+def install_module(monkeypatch, name, **attrs):
+    monkeypatch.setitem(sys.modules, name, types.SimpleNamespace(**attrs))
+
+
+def test_hot_search_job_fails_when_only_fallback_data_served(monkeypatch):
+    install_module(monkeypatch, "crawl_hot_search", main=lambda: {"realtime": TIER_FAILED, "novel": TIER_PARTIAL})
+    with pytest.raises(RuntimeError):
+        scheduler.crawl_hot_search_job()
+
+    install_module(monkeypatch, "crawl_hot_search", main=lambda: {"realtime": TIER_HTTP, "novel": TIER_FAILED})
+    scheduler.crawl_hot_search_job()
+
+
+def test_jobs_job_fails_when_nothing_crawled(monkeypatch):
+    install_module(monkeypatch, "jobs_spider", crawl_and_save_jobs=lambda: {"crawled": 0, "saved": 0})
+    with pytest.raises(RuntimeError):
+        scheduler.crawl_jobs_job()
+
+
+def test_failing_job_is_recorded_for_backoff(tmp_path, monkeypatch):
+    install_module(monkeypatch, "crawl_hot_search", main=lambda: {"realtime": TIER_FAILED})
+    runner = Scheduler(ledger=JobLedger(str(tmp_path / "ledger.json")))
+    job = runner.add_job("hot_search", scheduler.crawl_hot_search_job, 1800)
+
+    assert asyncio.run(runner.run_once(job)) is False
+    entry = runner.ledger.get("hot_search")
+    assert entry["last_status"] == "failed"
+    assert entry["failures"] == 1
+    assert "RuntimeError" in entry["last_error"]
@@ -0,0 +1,74 @@
+"""请求合并测试"""
+import asyncio
+import threading
+import time
+
+from hot_search_cache import HotSearchCache
+from single_flight import SingleFlight
+
+
+def test_concurrent_callers_on_cold_cache_fetch_once():
+    fetches = []
+    start = threading.Barrier(300)
+
+    def fetcher(category, known_hash):
+        fetches.append(category)
+        time.sleep(0.2)
+        return [{"word": "话题", "url": "", "img": "", "hot_score": "1", "desc": ""}], "hash"
+
+    cache = HotSearchCache(fetcher, categories=["realtime"])
+    results = []
+
+    def call():
+        start.wait()
+        results.append(cache.get_snapshot("realtime"))
+
+    threads = [threading.Thread(target=call) for _ in range(300)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(fetches) == 1
+    assert len(results) == 300 and all(snapshot is results[0] for snapshot in results)
+    stats = cache._flight.get_stats()
+    assert stats["executions"] == 1 and stats["coalesced"] == 299
+
+
+def test_cancelled_waiter_does_not_affect_others():
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.1)
+        return "ok"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do_async("k", slow))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do_async("k", slow))
+        sync_waiter = asyncio.get_running_loop().run_in_executor(None, flight.do, "k", lambda: "other")
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        return await leader, await sync_waiter, waiter.cancelled()
+
+    assert asyncio.run(main()) == ("ok", "ok", True)
+    assert flight.get_stats()["executions"] == 1
+
+
+def test_cancelled_leader_still_delivers_result():
+    flight = SingleFlight()
+
+    def blocking():
+        time.sleep(0.1)
+        return 42
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do_async("k", blocking))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(flight.do_async("k", blocking))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(main()) == 42
+    assert not flight.in_flight("k")
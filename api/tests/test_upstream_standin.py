@@ -0,0 +1,97 @@
+"""上游替身服务器测试：录制时脱敏、严格回放、故障注入和限流"""
+import json
+import os
+
+import httpx
+from fastapi.testclient import TestClient
+
+from upstream_standin import FixtureStore, StandinConfig, create_app
+
+BOARD_HTML = "<html><!--s-data:{\"data\":{\"cards\":[]}}--></html>"
+
+
+def fake_upstream(request: httpx.Request) -> httpx.Response:
+    """录制时转发到的真实站点"""
+    if request.url.host == "gitee.com" and request.url.path == "/oauth/token":
+        return httpx.Response(200, json={"access_token": "real-access", "refresh_token": "real-refresh", "expires_in": 86400})
+    if request.url.host == "top.baidu.com" and request.url.path == "/board":
+        return httpx.Response(200, text=BOARD_HTML.replace("cards", request.url.params["tab"]), headers={"content-type": "text/html; charset=utf-8"})
+    return httpx.Response(404)
+
+
+def standin(tmp_path, **config):
+    store = FixtureStore(str(tmp_path))
+    return TestClient(create_app(store, StandinConfig(**config), httpx.MockTransport(fake_upstream)))
+
+
+def record(tmp_path):
+    client = standin(tmp_path, mode="record")
+    tokens = client.post("/gitee/oauth/token", params={"grant_type": "authorization_code", "code": "abc", "client_secret": "s3cret"})
+    board = client.get("/baidu/board", params={"tab": "realtime"})
+    return tokens, board
+
+
+def test_record_redacts_tokens(tmp_path):
+    tokens, board = record(tmp_path)
+    assert tokens.json() == {"access_token": "fixture-access-token", "refresh_token": "fixture-refresh-token", "expires_in": 86400}
+    assert board.text == BOARD_HTML.replace("cards", "realtime")
+
+    saved = ""
+    for root, _, files in os.walk(tmp_path):
+        for name in files:
+            with open(os.path.join(root, name), encoding="utf-8") as f:
+                saved += f.read()
+    assert "real-access" not in saved and "real-refresh" not in saved and "s3cret" not in saved
+
+
+def test_replay_exact_match_and_strict_miss(tmp_path):
+    record(tmp_path)
+    client = standin(tmp_path)
+
+    hit = client.get("/baidu/board", params={"tab": "realtime"})
+    assert hit.status_code == 200
+    assert hit.text == BOARD_HTML.replace("cards", "realtime")
+    assert hit.headers["content-type"] == "text/html; charset=utf-8"
+    # 凭据类参数不参与匹配
+    token = client.post("/gitee/oauth/token", params={"grant_type": "authorization_code", "code": "other", "client_secret": "x"})
+    assert token.json()["access_token"] == "fixture-access-token"
+
+    miss = client.get("/baidu/board", params={"tab": "tech"})
+    assert miss.status_code == 404
+    assert "没有录制的响应" in miss.json()["error"]
+    assert client.get("/_standin/stats").json()["missing"] == 1
+
+    # 宽松模式才回放同一路径最近录制的响应
+    loose = standin(tmp_path, loose=True).get("/baidu/board", params={"tab": "tech"})
+    assert loose.status_code == 200
+
+
+def test_error_injection_is_reproducible_with_seed(tmp_path):
+    record(tmp_path)
+
+    def statuses(**config):
+        client = standin(tmp_path, seed=7, error_status=502, **config)
+        return [client.get("/baidu/board", params={"tab": "realtime"}).status_code for _ in range(20)]
+
+    assert statuses(error_rate=1.0) == [502] * 20
+    sequence = statuses(error_rate=0.5)
+    assert set(sequence) == {200, 502}
+    assert statuses(error_rate=0.5) == sequence
+
+
+def test_rate_limit_returns_429_with_retry_after(tmp_path):
+    record(tmp_path)
+    client = standin(tmp_path, rate_limit=2)
+    responses = [client.get("/baidu/board", params={"tab": "realtime"}) for _ in range(3)]
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert int(responses[2].headers["retry-after"]) >= 1
+    assert client.get("/_standin/stats").json()["throttled"] == 1
+
+
+def test_authorize_redirect_keeps_existing_query(tmp_path):
+    client = standin(tmp_path)
+    response = client.get("/gitee/oauth/authorize", params={"redirect_uri": "http://app/cb?next=/jobs", "state": "xyz"}, follow_redirects=False)
+    assert response.status_code in (302, 307)
+    location = httpx.URL(response.headers["location"])
+    assert location.path == "/cb"
+    assert dict(location.params) == {"next": "/jobs", "code": "fixture-code", "state": "xyz"}
@@ -6,7 +6,8 @@ cd /d "%~dp0"
 rem 激活Python环境（如果需要）
 rem call activate your_env
 
-rem 运行爬虫脚本
+rem 运行一次抓取（由外部定时器调用）
+rem 改用常驻调度器 start_scheduler.bat 后，请删除调用本脚本的定时任务，否则会重复抓取
 python crawl_hot_search.py
 
 rem 暂停查看结果（可选）
@@ -1,5 +1,4 @@
-import psycopg2
-from datetime import datetime
+from hot_search_history import save_hot_search_board
 
 """
 为热搜、电影、体育三个分类更新最新数据（使用备选数据）
@@ -7,39 +6,10 @@ from datetime import datetime
 
 def insert_hot_search_data(data):
     """
-    将热搜数据插入到数据库
+    将热搜数据按分类追加为新的快照版本，并更新当前榜单指针
     """
-    conn = None
-    try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="demo",
-            user="postgres",
-            password="admin"
-        )
-        cur = conn.cursor()
-        
-        # 清空现有数据
-        cur.execute("DELETE FROM baidu_hot_search")
-        
-        # 插入新数据
-        for item in data:
-            cur.execute(
-                "INSERT INTO baidu_hot_search (title, url, image_url, hot_index, rank_num, category, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                (item["title"], item["url"], item.get("image_url", ""), item.get("hot_index", ""), item["rank"], item.get("category", "realtime"), datetime.now())
-            )
-        
-        conn.commit()
-        cur.close()
-        print(f"成功插入 {len(data)} 条热搜数据")
-        
-    except Exception as e:
-        print(f"插入数据失败: {e}")
-        if conn:
-            conn.rollback()
-    finally:
-        if conn:
-            conn.close()
+    saved = save_hot_search_board(data)
+    print(f"成功插入 {saved} 条热搜数据")
 
 def main():
     """
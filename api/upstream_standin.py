@@ -0,0 +1,328 @@
+"""
+上游替身服务器（录制 / 回放）
+百度热搜、Boss直聘和 Gitee OAuth 的请求都可以指向本地的这个 ASGI 服务：
+录制模式把请求转发到真实站点并把响应保存为磁盘上的 fixture，回放模式只从 fixture 返回，
+并可以注入固定延迟、随机错误和限流（429），性能测试和回归测试因此可以在没有网络的机器上确定地重复运行
+
+用法：
+    录制：python upstream_standin.py --mode record
+    回放：python upstream_standin.py --latency 50 --jitter 20 --error-rate 0.05 --rate-limit 5 --seed 1
+然后把爬虫和 OAuth 地址指向替身服务器：
+    BAIDU_BASE_URL=http://127.0.0.1:8765/baidu
+    ZHIPIN_BASE_URL=http://127.0.0.1:8765/zhipin
+    GITEE_BASE_URL=http://127.0.0.1:8765/gitee
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, RedirectResponse, Response
+from starlette.routing import Route
+
+
+# 路径前缀 -> 真实站点
+UPSTREAMS = {
+    "baidu": "https://top.baidu.com",
+    "zhipin": "https://www.zhipin.com",
+    "gitee": "https://gitee.com",
+}
+
+# fixture 目录
+UPSTREAM_FIXTURE_DIR = os.getenv("UPSTREAM_FIXTURE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 每次请求都不同的凭据类参数，不参与 fixture 匹配
+IGNORED_PARAMS = {"access_token", "code", "client_id", "client_secret", "redirect_uri", "state"}
+
+# 录制时替换掉的响应字段，fixture 中不保存真实凭据
+REDACTED_FIELDS = ("access_token", "refresh_token")
+
+# 转发给真实站点的请求头
+FORWARD_HEADERS = (
+    "user-agent", "accept", "accept-language", "cookie", "content-type",
+    "referer", "origin", "if-none-match", "if-modified-since"
+)
+
+# 保存并回放的响应头
+STORED_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+
+# 回放时 /gitee/oauth/authorize 直接跳回 redirect_uri 携带的授权码
+FIXTURE_OAUTH_CODE = "fixture-code"
+
+
+def fixture_key(method: str, path: str, params=()) -> str:
+    """请求的 fixture 键：方法 + 路径 + 排序后的查询参数（忽略凭据类参数）"""
+    query = urlencode(sorted((k, v) for k, v in params if k not in IGNORED_PARAMS))
+    return hashlib.sha1(f"{method} {path}?{query}".encode("utf-8")).hexdigest()[:16]
+
+
+def append_query(url: str, params: Dict[str, str]) -> str:
+    """把参数合并到地址已有的查询字符串中"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + list(params.items())
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def redact(body: bytes, content_type: str) -> bytes:
+    """替换 JSON 响应中的令牌字段"""
+    if "json" not in content_type:
+        return body
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    if not isinstance(data, dict) or not any(field in data for field in REDACTED_FIELDS):
+        return body
+    for field in REDACTED_FIELDS:
+        if field in data:
+            data[field] = f"fixture-{field.replace('_', '-')}"
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+class FixtureStore:
+    """
+    磁盘上的 fixture，每个上游一个子目录，每个响应一个 JSON 文件
+    每个响应同时保存在精确键（含查询参数）和路径键下；回放默认只按精确键匹配，
+    宽松模式下找不到精确匹配时才用同一路径最近录制的响应（可能是其他分类或其他页的数据）
+    """
+
+    def __init__(self, directory: str = UPSTREAM_FIXTURE_DIR):
+        self.directory = directory
+
+    def _path(self, upstream: str, key: str) -> str:
+        return os.path.join(self.directory, upstream, f"{key}.json")
+
+    def _write(self, path: str, fixture: Dict[str, Any]):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def save(self, upstream: str, method: str, path: str, params, status: int, headers: Dict[str, str], body: bytes):
+        fixture = {
+            "method": method,
+            "path": path,
+            "query": urlencode(sorted((k, v) for k, v in params if k not in IGNORED_PARAMS)),
+            "status": status,
+            "headers": headers,
+            "recorded_at": time.time(),
+        }
+        try:
+            fixture["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            fixture["body_base64"] = base64.b64encode(body).decode("ascii")
+        self._write(self._path(upstream, fixture_key(method, path, params)), fixture)
+        self._write(self._path(upstream, fixture_key(method, path)), fixture)
+
+    def load(self, upstream: str, method: str, path: str, params, loose: bool = False) -> Optional[Dict[str, Any]]:
+        """按精确键查找，loose 为 True 时找不到再按路径键查找"""
+        keys = [fixture_key(method, path, params)]
+        if loose:
+            keys.append(fixture_key(method, path))
+        for key in keys:
+            try:
+                with open(self._path(upstream, key), encoding="utf-8") as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                continue
+        return None
+
+    @staticmethod
+    def body_of(fixture: Dict[str, Any]) -> bytes:
+        if "body_base64" in fixture:
+            return base64.b64decode(fixture["body_base64"])
+        return fixture.get("body", "").encode("utf-8")
+
+
+@dataclass
+class StandinConfig:
+    """
+    回放时的故障注入配置
+
+    Attributes:
+        latency: 每个响应的固定延迟（毫秒）
+        jitter: 在固定延迟上增加的随机延迟上限（毫秒）
+        error_rate: 返回 error_status 的概率
+        rate_limit: 每个上游每秒允许的请求数，超出返回 429，为 0 时不限流
+        seed: 随机数种子，固定后延迟和错误序列可重复
+        loose: 没有精确匹配的录制时是否回放同一路径最近录制的响应，默认返回 404
+    """
+    mode: str = "replay"
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    rate_limit: float = 0.0
+    seed: Optional[int] = None
+    loose: bool = False
+
+
+class TokenBucket:
+    """令牌桶限流，容量为一秒的请求数"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> float:
+        """取一个令牌，成功返回 0，否则返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class UpstreamStandin:
+    """替身服务器，路径的第一段选择上游：/baidu/board?tab=realtime -> https://top.baidu.com/board?tab=realtime"""
+
+    def __init__(self, store: FixtureStore = None, config: StandinConfig = None, transport: httpx.AsyncBaseTransport = None):
+        """transport 为录制时转发请求使用的 httpx 传输层，默认访问真实站点"""
+        self.store = store or FixtureStore()
+        self.config = config or StandinConfig()
+        self.transport = transport
+        self._random = random.Random(self.config.seed)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._stats = {"recorded": 0, "replayed": 0, "missing": 0, "errors": 0, "throttled": 0}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=15, follow_redirects=True, transport=self.transport)
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _throttle(self, upstream: str) -> float:
+        if self.config.rate_limit <= 0:
+            return 0.0
+        bucket = self._buckets.get(upstream)
+        if bucket is None:
+            bucket = self._buckets.setdefault(upstream, TokenBucket(self.config.rate_limit))
+        return bucket.take()
+
+    async def _record(self, upstream: str, request: Request, path: str) -> Response:
+        """转发到真实站点并保存响应"""
+        headers = {name: value for name, value in request.headers.items() if name in FORWARD_HEADERS}
+        response = await self._get_client().request(
+            request.method,
+            UPSTREAMS[upstream] + path,
+            params=list(request.query_params.multi_items()),
+            headers=headers,
+            content=await request.body()
+        )
+        stored_headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        body = redact(response.content, stored_headers.get("content-type", ""))
+        self.store.save(
+            upstream, request.method, path, request.query_params.multi_items(),
+            response.status_code, stored_headers, body
+        )
+        self._stats["recorded"] += 1
+        print(f"已录制 {request.method} {upstream}{path} -> {response.status_code}，{len(body)} 字节")
+        return Response(content=body, status_code=response.status_code, headers=stored_headers)
+
+    async def _replay(self, upstream: str, request: Request, path: str) -> Response:
+        """按配置注入限流、错误和延迟后返回录制的响应"""
+        retry_after = self._throttle(upstream)
+        if retry_after > 0:
+            self._stats["throttled"] += 1
+            return JSONResponse({"error": "too many requests"}, status_code=429, headers={"Retry-After": str(max(1, round(retry_after)))})
+        delay = self.config.latency + self._random.uniform(0, self.config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if self.config.error_rate > 0 and self._random.random() < self.config.error_rate:
+            self._stats["errors"] += 1
+            return JSONResponse({"error": "injected failure"}, status_code=self.config.error_status)
+
+        if upstream == "gitee" and path == "/oauth/authorize":
+            # 授权页需要用户登录，无法录制；直接带着固定的授权码跳回应用
+            params = {"code": FIXTURE_OAUTH_CODE}
+            if "state" in request.query_params:
+                params["state"] = request.query_params["state"]
+            return RedirectResponse(append_query(request.query_params.get("redirect_uri", "/"), params))
+
+        fixture = self.store.load(upstream, request.method, path, request.query_params.multi_items(), self.config.loose)
+        if fixture is None:
+            self._stats["missing"] += 1
+            return JSONResponse({"error": f"没有录制的响应: {request.method} {upstream}{path}"}, status_code=404)
+        self._stats["replayed"] += 1
+        return Response(content=FixtureStore.body_of(fixture), status_code=fixture["status"], headers=fixture["headers"])
+
+    async def handle(self, request: Request) -> Response:
+        upstream, _, rest = request.url.path.lstrip("/").partition("/")
+        if upstream not in UPSTREAMS:
+            return JSONResponse({"error": f"未知上游: {upstream}", "upstreams": list(UPSTREAMS)}, status_code=404)
+        path = "/" + rest
+        if self.config.mode == "record":
+            try:
+                return await self._record(upstream, request, path)
+            except httpx.HTTPError as e:
+                print(f"录制 {upstream}{path} 失败: {e}")
+                return JSONResponse({"error": str(e)}, status_code=502)
+        return await self._replay(upstream, request, path)
+
+    async def stats(self, request: Request) -> Response:
+        return JSONResponse(dict(self._stats, mode=self.config.mode))
+
+
+def create_app(store: FixtureStore = None, config: StandinConfig = None, transport: httpx.AsyncBaseTransport = None) -> Starlette:
+    """创建替身服务器的 ASGI 应用，/_standin/stats 返回录制和回放统计"""
+    standin = UpstreamStandin(store, config, transport)
+    methods = ["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD"]
+    return Starlette(
+        routes=[
+            Route("/_standin/stats", standin.stats),
+            Route("/{path:path}", standin.handle, methods=methods),
+        ],
+        on_shutdown=[standin.close]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="上游替身服务器（录制 / 回放）")
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=UPSTREAM_FIXTURE_DIR, help="fixture 目录")
+    parser.add_argument("--latency", type=float, default=0.0, help="固定延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="随机延迟上限（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="注入错误的概率")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="每个上游每秒允许的请求数，0 为不限流")
+    parser.add_argument("--seed", type=int, default=None, help="随机数种子")
+    parser.add_argument("--loose", action="store_true", help="没有精确匹配的录制时回放同一路径最近录制的响应")
+    args = parser.parse_args()
+
+    config = StandinConfig(
+        mode=args.mode, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        error_status=args.error_status, rate_limit=args.rate_limit, seed=args.seed,
+        loose=args.loose
+    )
+    import uvicorn
+    print(f"替身服务器（{args.mode}）: http://{args.host}:{args.port}，fixture 目录: {args.fixtures}")
+    uvicorn.run(create_app(FixtureStore(args.fixtures), config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,84 @@
 import psycopg2
 
+from baidu_hot_spider import HOT_SEARCH_CATEGORIES
+from db_config import get_connection_params
+
 """
 验证数据库中数据是否正确存储
+当前榜单为 hot_search_latest 指向的快照版本，条目存放在 hot_search_history 中
 """
 
+CATEGORY_NAMES = {"realtime": "热搜", "movie": "电影", "sport": "体育", "tech": "科技", "entertainment": "娱乐"}
+
 def verify_data():
     """
     验证数据库中的数据
     """
     conn = None
     try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="demo",
-            user="postgres",
-            password="admin"
-        )
+        conn = psycopg2.connect(**get_connection_params())
         cur = conn.cursor()
-        
-        # 查询总数据量
-        cur.execute("SELECT COUNT(*) FROM baidu_hot_search")
+
+        # 查询快照版本数和历史条目总量
+        cur.execute("SELECT COUNT(*) FROM hot_search_snapshots")
+        snapshot_count = cur.fetchone()[0]
+        cur.execute("SELECT COUNT(*) FROM hot_search_history")
         total_count = cur.fetchone()[0]
-        print(f"数据库中总数据量: {total_count}")
-        
-        # 查询每个分类的数据量
-        categories = ["realtime", "movie", "sport"]
-        category_names = {"realtime": "热搜", "movie": "电影", "sport": "体育"}
-        
-        for category in categories:
-            cur.execute("SELECT COUNT(*) FROM baidu_hot_search WHERE category = %s", (category,))
-            count = cur.fetchone()[0]
-            print(f"{category_names[category]} 分类数据量: {count}")
-            
-            # 检查是否为30条
-            if count == 30:
-                print(f"✓ {category_names[category]} 分类数据量正确（30条）")
+        print(f"数据库中快照版本数: {snapshot_count}，历史条目总量: {total_count}")
+
+        # 检查每个分类的当前榜单：指针指向的快照存在，且条目数与快照记录的一致
+        success = True
+        for category in HOT_SEARCH_CATEGORIES:
+            name = CATEGORY_NAMES.get(category, category)
+            cur.execute("""
+                SELECT s.id, s.item_count, s.captured_at, COUNT(h.rank_num)
+                FROM hot_search_latest l
+                JOIN hot_search_snapshots s ON s.id = l.snapshot_id
+                LEFT JOIN hot_search_history h ON h.snapshot_id = s.id AND h.captured_at = s.captured_at
+                WHERE l.category = %s
+                GROUP BY s.id, s.item_count, s.captured_at
+            """, (category,))
+            row = cur.fetchone()
+            if row is None:
+                print(f"✗ {name} 分类没有当前榜单")
+                success = False
+                continue
+            snapshot_id, item_count, captured_at, count = row
+            print(f"{name} 分类当前榜单: 快照 {snapshot_id}（{captured_at}），{count} 条")
+
+            if count > 0 and count == item_count:
+                print(f"✓ {name} 分类数据量正确（{count}条）")
             else:
-                print(f"✗ {category_names[category]} 分类数据量错误，应为30条，实际为{count}条")
-        
-        # 查看前几条数据结构
-        print("\n查看前5条数据结构:")
-        cur.execute("SELECT * FROM baidu_hot_search LIMIT 5")
+                print(f"✗ {name} 分类数据量错误，快照记录为{item_count}条，实际为{count}条")
+                success = False
+
+        # 查看当前热搜榜前几条数据结构
+        print("\n查看当前热搜榜前5条数据结构:")
+        cur.execute("""
+            SELECT h.rank_num, h.item_id, h.title, h.url, h.image_url, h.hot_index, h.category, h.captured_at
+            FROM hot_search_latest l
+            JOIN hot_search_snapshots s ON s.id = l.snapshot_id
+            JOIN hot_search_history h ON h.snapshot_id = s.id AND h.captured_at = s.captured_at
+            WHERE l.category = %s
+            ORDER BY h.rank_num
+            LIMIT 5
+        """, ("realtime",))
         rows = cur.fetchall()
-        
+
         for i, row in enumerate(rows, 1):
             print(f"\n第 {i} 条数据:")
-            print(f"  ID: {row[0]}")
-            print(f"  排名: {row[1]}")
+            print(f"  排名: {row[0]}")
+            print(f"  条目ID: {row[1]}")
             print(f"  标题: {row[2]}")
             print(f"  URL: {row[3]}")
-            print(f"  创建时间: {row[4]}")
-            print(f"  图片URL: {row[5]}")
-            print(f"  热搜指数: {row[6]}")
-            print(f"  分类: {category_names.get(row[7], row[7])}")
-        
+            print(f"  图片URL: {row[4]}")
+            print(f"  热搜指数: {row[5]}")
+            print(f"  分类: {CATEGORY_NAMES.get(row[6], row[6])}")
+            print(f"  抓取时间: {row[7]}")
+
         cur.close()
-        return True
-        
+        return success
+
     except Exception as e:
         print(f"验证数据失败: {e}")
         return False
@@ -70,7 +92,7 @@ def main():
     """
     print("验证数据库中数据是否正确存储...")
     success = verify_data()
-    
+
     if success:
         print("\n✓ 数据验证成功")
     else:
@@ -0,0 +1,27 @@
+const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8002'
+
+// 后端 /api/img 允许代理的图片域名（后缀匹配），需要和后端 IMAGE_PROXY_HOSTS 保持一致
+const PROXY_HOSTS = (import.meta.env.VITE_IMAGE_PROXY_HOSTS || 'baidu.com,bdstatic.com,bdimg.com,bcebos.com,zhipin.com,bosszhipin.com')
+    .split(',')
+    .map(host => host.trim().toLowerCase())
+    .filter(Boolean)
+
+const isProxyable = (url) => {
+    try {
+        const { protocol, hostname } = new URL(url)
+        if (protocol !== 'http:' && protocol !== 'https:') return false
+        return PROXY_HOSTS.some(host => hostname === host || hostname.endsWith('.' + host))
+    } catch (e) {
+        return false
+    }
+}
+
+// 外链图片（热搜配图、公司 logo）通过后端 /api/img 代理加载，width 为缩略图宽度；
+// 后端不代理的域名直接加载原图，避免图片被 403 挡掉
+export const proxiedImage = (url, width) => {
+    if (!url) return ''
+    if (!isProxyable(url)) return url
+    const params = new URLSearchParams({ url })
+    if (width) params.set('w', width)
+    return `${API_BASE_URL}/api/img?${params}`
+}